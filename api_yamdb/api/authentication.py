@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_cache
+
+
+def _changed_key(user_id):
+    return f'auth:user-changed:{user_id}'
+
+
+class UserCache:
+    """
+    LRU-кеш пользователей в памяти процесса с коротким временем жизни.
+
+    Изменение пользователя сбрасывает запись локально и записывает
+    время изменения в общий кеш, по которому записи устаревают и в
+    остальных процессах.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is None:
+                return None
+            user, fetched_at = entry
+            if time.time() - fetched_at > settings.JWT_USER_CACHE_TTL:
+                del self.users[user_id]
+                return None
+            self.users.move_to_end(user_id)
+        changed_at = get_cache().get(_changed_key(user_id))
+        if changed_at is not None and changed_at >= fetched_at:
+            self.forget(user_id)
+            return None
+        return user
+
+    def set(self, user_id, user):
+        with self.lock:
+            self.users[user_id] = (user, time.time())
+            self.users.move_to_end(user_id)
+            while len(self.users) > settings.JWT_USER_CACHE_SIZE:
+                self.users.popitem(last=False)
+
+    def forget(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def invalidate(self, user_id):
+        self.forget(user_id)
+        get_cache().set(
+            _changed_key(user_id), time.time(),
+            settings.JWT_USER_CACHE_TTL
+        )
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+user_cache = UserCache()
+
+
+def get_token_for_user(token_class, user):
+    """Токен с ролью и статусом пользователя в claims."""
+    token = token_class.for_user(user)
+    token['username'] = user.username
+    token['role'] = user.role
+    token['is_active'] = user.is_active
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, которая берет пользователя из user_cache и ходит
+    в БД только при промахе. Роль для проверки прав всегда берется из
+    закешированной строки пользователя, а не из claims токена, поэтому
+    смена роли действует сразу, а не после истечения токена.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        if validated_token.get('is_active') is False:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,180 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(model):
+    return f'generation:{model._meta.label_lower}'
+
+
+def _modified_key(model):
+    return f'modified:{model._meta.label_lower}'
+
+
+def _initial_generation():
+    # После вытеснения ключа счетчик не должен вернуться к уже
+    # использованному значению, поэтому стартуем от текущего времени.
+    return int(time.time() * 1000)
+
+
+def bump_generation(*models):
+    """Инвалидирует все закешированные ответы, зависящие от моделей."""
+    cache = get_cache()
+    now = time.time()
+    for model in models:
+        key = _generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_generation(), None)
+        cache.set(_modified_key(model), now, None)
+
+
+def get_versions(models):
+    """
+    Возвращает счетчики поколений моделей и время последнего изменения
+    самой свежей из них одним запросом к кешу.
+    """
+    cache = get_cache()
+    generation_keys = [_generation_key(model) for model in models]
+    modified_keys = [_modified_key(model) for model in models]
+    values = cache.get_many(generation_keys + modified_keys)
+    for key in generation_keys:
+        if key not in values:
+            cache.add(key, _initial_generation(), None)
+            values[key] = cache.get(key)
+    for key in modified_keys:
+        if key not in values:
+            # Время изменения неизвестно, считаем, что модель изменилась
+            # только что: клиент получит полный ответ.
+            cache.add(key, time.time(), None)
+            values[key] = cache.get(key)
+    return (
+        [values[key] for key in generation_keys],
+        max((values[key] for key in modified_keys), default=0),
+    )
+
+
+def get_generations(models):
+    return get_versions(models)[0]
+
+
+class VersionedViewMixin:
+    """Версии моделей из cache_dependencies, общие на весь запрос."""
+    cache_dependencies = ()
+
+    def get_versions(self):
+        if not hasattr(self, '_versions'):
+            self._versions = get_versions(self.cache_dependencies)
+        return self._versions
+
+
+class CachedResponseMixin(VersionedViewMixin):
+    """
+    Кеширует ответы анонимных GET-запросов.
+
+    Ключ включает строку запроса и счетчики поколений моделей из
+    cache_dependencies, поэтому запись в любую из них делает старые
+    страницы недостижимыми.
+    """
+
+    def get_response_cache_key(self, request):
+        generations = '.'.join(
+            str(generation) for generation in self.get_versions()[0]
+        )
+        path = hashlib.md5(
+            request.get_full_path().encode('utf-8')
+        ).hexdigest()
+        return (
+            f'response:{self.basename}:{self.action}:{generations}:{path}'
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+    """
+    Отдает ETag и Last-Modified для list и retrieve и отвечает 304 на
+    If-None-Match/If-Modified-Since до выполнения запроса к БД.
+
+    ETag строится из счетчиков поколений cache_dependencies, адреса и
+    формата ответа, Last-Modified - из времени последнего изменения этих
+    моделей, округленного вверх до секунды. Пока эта секунда не прошла,
+    следующая запись получила бы тот же Last-Modified, поэтому до тех пор
+    заголовок не отдается и ответ сверяется только по ETag.
+    """
+
+    def get_etag(self, request):
+        generations = '.'.join(
+            str(generation) for generation in self.get_versions()[0]
+        )
+        media_type = getattr(request, 'accepted_media_type', '')
+        value = (
+            f'{self.basename}:{self.action}:{generations}:'
+            f'{media_type}:{request.get_full_path()}'
+        )
+        return '"%s"' % hashlib.md5(value.encode('utf-8')).hexdigest()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        etag = self.get_etag(request)
+        last_modified = math.ceil(self.get_versions()[1])
+        if last_modified > time.time():
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
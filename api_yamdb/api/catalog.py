@@ -0,0 +1,216 @@
+import threading
+
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from reviews.models import Category, Genre
+
+from .cache import get_versions
+
+
+class CatalogSnapshot:
+    """Неизменяемая копия таблицы в порядке ordering модели."""
+
+    def __init__(self, version, objects):
+        self.version = version
+        self.objects = objects
+        self.by_pk = {obj.pk: obj for obj in objects}
+        self.by_slug = {obj.slug: obj for obj in objects}
+        self.position = {obj.pk: index for index, obj in enumerate(objects)}
+        # Класс сериализатора -> {pk: готовое представление}.
+        self.representations = {}
+
+    def represent(self, obj, serializer_class):
+        if serializer_class is None:
+            return obj.slug
+        cached = self.representations.setdefault(serializer_class, {})
+        if obj.pk not in cached:
+            # Без ссылки ReturnDict на сериализатор: ответы кешируются.
+            cached[obj.pk] = dict(serializer_class(obj).data)
+        return cached[obj.pk]
+
+
+class Catalog:
+    """
+    Маленькая редко меняющаяся таблица (категории, жанры) в памяти
+    процесса: объекты по slug и по id.
+
+    Загружается при первом обращении. Версия - счетчик поколений модели
+    в общем кеше, его увеличивает каждая запись в таблицу, поэтому
+    изменение в одном процессе перезагружает каталог во всех. Версия
+    проверяется один раз за HTTP-запрос, вне запросов - при каждом
+    обращении. Промахи проверяются по БД.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.snapshot = None
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются вместе с аргументами, а каталог
+        # один на процесс.
+        return self
+
+    def begin_request(self, **kwargs):
+        self.local.in_request = True
+        self.local.snapshot = None
+
+    def end_request(self, **kwargs):
+        self.local.in_request = False
+        self.local.snapshot = None
+
+    def invalidate(self, **kwargs):
+        """Сбрасывает проверенную в этом запросе версию."""
+        self.local.snapshot = None
+
+    def get_snapshot(self):
+        snapshot = getattr(self.local, 'snapshot', None)
+        if snapshot is not None:
+            return snapshot
+        version = get_versions((self.model,))[0][0]
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != version:
+            with self.lock:
+                snapshot = self.snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self.snapshot = CatalogSnapshot(
+                        version, list(self.model._default_manager.all())
+                    )
+        if getattr(self.local, 'in_request', False):
+            self.local.snapshot = snapshot
+        return snapshot
+
+    def get(self, pk):
+        obj = self.get_snapshot().by_pk.get(pk)
+        if obj is None:
+            return self.model._default_manager.filter(pk=pk).first()
+        return obj
+
+    def get_by_slug(self, slug):
+        obj = self.get_snapshot().by_slug.get(slug)
+        if obj is None:
+            return self.model._default_manager.filter(slug=slug).first()
+        return obj
+
+    def represent(self, pk, serializer_class=None):
+        snapshot = self.get_snapshot()
+        obj = snapshot.by_pk.get(pk)
+        if obj is None:
+            obj = self.get(pk)
+            return None if obj is None else snapshot.represent(
+                obj, serializer_class
+            )
+        return snapshot.represent(obj, serializer_class)
+
+    def represent_many(self, pks, serializer_class=None):
+        """Представления в порядке ordering модели, как у prefetch."""
+        snapshot = self.get_snapshot()
+        last = len(snapshot.position)
+        data = []
+        for pk in sorted(
+            pks, key=lambda pk: snapshot.position.get(pk, last)
+        ):
+            item = self.represent(pk, serializer_class)
+            if item is not None:
+                data.append(item)
+        return data
+
+
+category_catalog = Catalog(Category)
+genre_catalog = Catalog(Genre)
+CATALOGS = (category_catalog, genre_catalog)
+
+
+def load_catalogs():
+    """Загружает каталоги заранее, например после очистки кеша."""
+    for catalog in CATALOGS:
+        catalog.get_snapshot()
+
+
+class CatalogSlugField(serializers.SlugRelatedField):
+    """SlugRelatedField для записи, который ищет slug в каталоге."""
+
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        kwargs.setdefault('slug_field', 'slug')
+        kwargs.setdefault('queryset', catalog.model._default_manager.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)) or isinstance(data, bool):
+            self.fail('invalid')
+        obj = self.catalog.get_by_slug(str(data))
+        if obj is None:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+        return obj
+
+
+class CatalogRelatedField(serializers.Field):
+    """
+    Категория произведения из каталога для чтения. source - внешний ключ
+    (category_id), serializer_class - сериализатор вложенного объекта,
+    без него отдается slug.
+    """
+
+    def __init__(self, catalog, serializer_class=None, **kwargs):
+        self.catalog = catalog
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.catalog.represent(value, self.serializer_class)
+
+
+class CatalogRelatedListField(serializers.Field):
+    """
+    Жанры произведения из каталога для чтения. source - связь с
+    промежуточной моделью (genres), related_field - внешний ключ на
+    объект каталога в ней (genre_id).
+    """
+
+    def __init__(self, catalog, related_field, serializer_class=None,
+                 **kwargs):
+        self.catalog = catalog
+        self.related_field = related_field
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.represent_ids(
+            getattr(link, self.related_field) for link in value.all()
+        )
+
+    def represent_ids(self, pks):
+        return self.catalog.represent_many(pks, self.serializer_class)
+
+
+class CatalogListMixin:
+    """
+    Список без поиска отдается из каталога, без запросов к БД. Порядок,
+    постраничный вывод и представление те же, что у обычного списка.
+    """
+    catalog = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            return super().list(request, *args, **kwargs)
+        serializer_class = self.get_serializer_class()
+        snapshot = self.catalog.get_snapshot()
+        objects = snapshot.objects
+        page = self.paginate_queryset(objects)
+        data = [
+            snapshot.represent(obj, serializer_class)
+            for obj in (objects if page is None else page)
+        ]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,29 @@
+import time
+
+from django.db import connections
+
+
+def check_connections_health(**kwargs):
+    """
+    Перед обработкой запроса закрывает сохраненные соединения, которые
+    перестали отвечать, чтобы запрос не упал на оборванном соединении.
+    Включается ключом CONN_HEALTH_CHECKS в настройках БД. Одно соединение
+    проверяется не чаще раза в CONN_HEALTH_CHECK_INTERVAL секунд: при
+    частых запросах оборванное соединение и так обнаружится быстро, а
+    лишний SELECT 1 на каждый запрос заметен.
+    """
+    now = time.monotonic()
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            or connection.in_atomic_block
+            or now < getattr(connection, 'health_check_due', 0)
+        ):
+            continue
+        if connection.is_usable():
+            connection.health_check_due = now + connection.settings_dict.get(
+                'CONN_HEALTH_CHECK_INTERVAL', 0
+            )
+        else:
+            connection.close()
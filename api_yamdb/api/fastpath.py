@@ -0,0 +1,203 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .catalog import CatalogRelatedField, CatalogRelatedListField
+from .sparse import fieldset_key
+
+
+def identity(value):
+    return value
+
+
+def placeholder(value):
+    return None
+
+
+class ValuesPlan:
+    """
+    Заранее разобранный сериализатор для чтения.
+
+    Строки .values() превращаются в те же словари, что и
+    to_representation: для каждого поля известны колонка и функция
+    преобразования, поэтому на запрос не создаются ни модели, ни поля
+    сериализатора. Связи многие-ко-многим читаются одним запросом на
+    страницу. compile возвращает None, если сериализатор нельзя свести к
+    колонкам, тогда представление работает как обычно.
+    """
+
+    def __init__(self, model, prefix=''):
+        self.model = model
+        self.prefix = prefix
+        self.paths = [f'{prefix}{model._meta.pk.name}']
+        self.steps = []
+        self.many = []
+
+    @classmethod
+    def compile(cls, serializer, model, prefix=''):
+        plan = cls(model, prefix)
+        for name, field in serializer.fields.items():
+            if not plan.add_field(name, field):
+                return None
+        return plan
+
+    def add_field(self, name, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            return False
+        if isinstance(field, CatalogRelatedField):
+            # Объект берется из каталога по значению внешнего ключа.
+            path = self.prefix + field.source
+            self.paths.append(path)
+            self.steps.append((name, path, field.to_representation, None))
+            return True
+        if isinstance(field, CatalogRelatedListField):
+            return not self.prefix and self.add_catalog_list(name, field)
+        if len(field.source_attrs) != 1:
+            return False
+        try:
+            model_field = self.model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return False
+        path = self.prefix + model_field.name
+        if not model_field.is_relation:
+            self.paths.append(path)
+            self.steps.append((name, path, field.to_representation, None))
+            return True
+        if model_field.many_to_many and not self.prefix:
+            return self.add_many(name, field, model_field)
+        if not (model_field.many_to_one and model_field.concrete):
+            return False
+        return self.add_related(name, field, model_field, path)
+
+    def add_related(self, name, field, model_field, path):
+        """Внешний ключ: slug или вложенный объект через join."""
+        if isinstance(field, serializers.SlugRelatedField):
+            if '__' in field.slug_field:
+                return False
+            slug = f'{path}__{field.slug_field}'
+            self.paths.append(slug)
+            self.steps.append((name, slug, identity, None))
+            return True
+        if not isinstance(field, serializers.Serializer):
+            return False
+        nested = self.compile(field, model_field.related_model, f'{path}__')
+        if nested is None or nested.many:
+            return False
+        self.paths.extend(nested.paths)
+        # Первичный ключ из LEFT JOIN: NULL, если связи нет.
+        self.steps.append((name, nested.paths[0], None, nested))
+        return True
+
+    def add_many(self, name, field, model_field):
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+        elif isinstance(field, serializers.ManyRelatedField):
+            child = field.child_relation
+        else:
+            return False
+        related_model = model_field.related_model
+        if isinstance(child, serializers.SlugRelatedField):
+            if '__' in child.slug_field:
+                return False
+            slug = child.slug_field
+            columns = (slug,)
+
+            def finish(rows):
+                return [row[slug] for row in rows]
+        elif isinstance(child, serializers.Serializer):
+            nested = self.compile(child, related_model)
+            if nested is None or nested.many:
+                return False
+            columns = nested.paths
+
+            def finish(rows):
+                return [nested.render_row(row) for row in rows]
+        else:
+            return False
+        self.add_related_list(
+            name, related_model, model_field.related_query_name(),
+            columns, finish,
+        )
+        return True
+
+    def add_catalog_list(self, name, field):
+        """Из промежуточной модели читаются только id объектов каталога."""
+        relation = self.model._meta.get_field(field.source)
+        column = field.related_field
+        self.add_related_list(
+            name, relation.related_model, relation.field.name, (column,),
+            lambda rows: field.represent_ids(row[column] for row in rows),
+        )
+        return True
+
+    def add_related_list(self, name, related_model, query_name, columns,
+                         finish):
+        """
+        Список связанных объектов: строки related_model со значением
+        query_name из страницы, finish собирает из них значение поля.
+        """
+        self.many.append((name, related_model, query_name, columns, finish))
+        # Место в порядке полей, список заполняет render.
+        self.steps.append((name, self.paths[0], placeholder, None))
+
+    def render_row(self, row):
+        data = {}
+        for name, path, convert, nested in self.steps:
+            value = row[path]
+            if value is None:
+                data[name] = None
+            elif nested is not None:
+                data[name] = nested.render_row(row)
+            else:
+                data[name] = convert(value)
+        return data
+
+    def render(self, rows):
+        rows = list(rows)
+        data = [self.render_row(row) for row in rows]
+        if not self.many or not data:
+            return data
+        ids = [row[self.paths[0]] for row in rows]
+        for name, related_model, query_name, columns, finish in self.many:
+            # Порядок как у prefetch_related: по ordering связанной модели.
+            related = {}
+            for row in related_model._default_manager.filter(**{
+                f'{query_name}__in': ids
+            }).values(query_name, *columns):
+                related.setdefault(row[query_name], []).append(row)
+            for item, pk in zip(data, ids):
+                item[name] = finish(related.get(pk, ()))
+        return data
+
+
+class ValuesListMixin:
+    """
+    Список для чтения через ValuesPlan. Планы разбираются один раз на
+    класс сериализатора и набор полей из ?fields= и ?expand=. Включается
+    настройкой API_FAST_LISTS.
+    """
+    values_plans = {}
+
+    def get_values_plan(self):
+        context = self.get_serializer_context()
+        serializer_class = self.get_serializer_class()
+        key = fieldset_key(serializer_class, context)
+        if key not in self.values_plans:
+            self.values_plans[key] = ValuesPlan.compile(
+                serializer_class(context=context),
+                serializer_class.Meta.model,
+            )
+        return self.values_plans[key]
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan() if settings.API_FAST_LISTS else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(
+            self.get_queryset()
+        ).prefetch_related(None).values(*plan.paths)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(queryset))
@@ -1,5 +1,6 @@
 import django_filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -13,6 +14,7 @@ class TitleFilter(django_filters.FilterSet):
         field_name='category__slug',
         lookup_expr='exact'
     )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
@@ -22,3 +24,6 @@ class TitleFilter(django_filters.FilterSet):
             'genre',
             'category',
         ]
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.http import JsonResponse
+
+
+def health(request):
+    """Процесс жив и обрабатывает запросы."""
+    return JsonResponse({'status': 'ok'})
+
+
+def ready(request):
+    """Приложение готово принимать трафик: доступны БД и кеш."""
+    checks = {}
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            checks[f'db:{alias}'] = 'ok'
+        except DatabaseError as error:
+            checks[f'db:{alias}'] = str(error)
+    for alias in settings.CACHES:
+        try:
+            caches[alias].get('readiness-check')
+            checks[f'cache:{alias}'] = 'ok'
+        except Exception as error:
+            checks[f'cache:{alias}'] = str(error)
+    is_ready = all(result == 'ok' for result in checks.values())
+    return JsonResponse(
+        {'status': 'ok' if is_ready else 'unavailable', 'checks': checks},
+        status=200 if is_ready else 503
+    )
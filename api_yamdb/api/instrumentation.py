@@ -0,0 +1,213 @@
+import bisect
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+TIME_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def as_dict(self):
+        labels = [f'le_{bucket}' for bucket in self.buckets] + ['le_inf']
+        return {
+            'count': self.total,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.total, 3) if self.total else None,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы запросов по представлениям в памяти процесса."""
+    metrics = (
+        ('wall_ms', TIME_BUCKETS),
+        ('db_ms', TIME_BUCKETS),
+        ('serialize_ms', TIME_BUCKETS),
+        ('queries', QUERY_BUCKETS),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view_name, values):
+        with self.lock:
+            histograms = self.views.get(view_name)
+            if histograms is None:
+                histograms = self.views[view_name] = {
+                    name: Histogram(buckets) for name, buckets in self.metrics
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view_name, histograms in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = MetricsRegistry()
+
+
+class ConnectionStats:
+    """
+    Счетчики соединений с БД: connects - сколько раз Django открыл
+    соединение, physical_opens - сколько новых соединений создал пул.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.connects = 0
+            self.physical_opens = 0
+
+    def record_connect(self, **kwargs):
+        with self.lock:
+            self.connects += 1
+
+    def record_physical_open(self):
+        with self.lock:
+            self.physical_opens += 1
+
+    def snapshot(self):
+        with self.lock:
+            uptime = max(time.monotonic() - self.started, 1e-6)
+            return {
+                'uptime_s': round(uptime, 1),
+                'connects': self.connects,
+                'connects_per_s': round(self.connects / uptime, 3),
+                'physical_opens': self.physical_opens,
+                'physical_opens_per_s': round(
+                    self.physical_opens / uptime, 3
+                ),
+            }
+
+
+connection_stats = ConnectionStats()
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Считает для выборки запросов число SQL-запросов, время в БД,
+    сериализации и общее время. Результат отдается заголовком
+    Server-Timing и копится в гистограммах по представлениям.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = request.request_metrics = RequestMetrics()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        wall_time = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serialize_time * 1000:.1f}',
+            f'total;dur={wall_time * 1000:.1f}',
+        ))
+        match = request.resolver_match
+        registry.record(
+            match.view_name if match else 'unresolved',
+            {
+                'wall_ms': wall_time * 1000,
+                'db_ms': metrics.db_time * 1000,
+                'serialize_ms': metrics.serialize_time * 1000,
+                'queries': metrics.queries,
+            }
+        )
+        return response
+
+
+class InstrumentedViewMixin:
+    """
+    Добавляет к метрикам RequestMetricsMiddleware время сериализации:
+    время обработчика без учета запросов к БД плюс время рендеринга.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        metrics = getattr(request._request, 'request_metrics', None)
+        if metrics is not None:
+            self._metrics_started = (time.perf_counter(), metrics.db_time)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        started = getattr(self, '_metrics_started', None)
+        if started is None:
+            return response
+        metrics = request._request.request_metrics
+        handler_time = time.perf_counter() - started[0]
+        metrics.serialize_time += handler_time - (
+            metrics.db_time - started[1]
+        )
+        # Ответ 304 из ConditionalGetMixin не требует рендеринга.
+        render = getattr(response, 'render', None)
+        if render is None:
+            return response
+
+        def timed_render():
+            render_started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                metrics.serialize_time += (
+                    time.perf_counter() - render_started
+                )
+
+        response.render = timed_render
+        return response
@@ -0,0 +1,159 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+
+from .models import QueuedMail
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    Ограниченная очередь исходящих писем с фоновыми потоками отправки.
+
+    Потоки забирают письма пачками и отправляют их через одно соединение
+    с почтовым бэкендом, повторяя неудачные попытки с экспоненциальной
+    задержкой. При переполнении очереди письмо сохраняется в таблицу
+    QueuedMail, ее потоки разбирают, когда очередь в памяти пуста. Поток
+    запроса почту не отправляет.
+    """
+    # Как часто свободный поток проверяет таблицу, секунды.
+    poll_interval = 5
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = None
+        self.workers = []
+        self.spilled = threading.Event()
+
+    @property
+    def options(self):
+        return settings.EMAIL_QUEUE
+
+    def start(self):
+        with self.lock:
+            if self.queue is not None:
+                return
+            self.queue = queue.Queue(maxsize=self.options['MAX_SIZE'])
+            # Письма могли остаться в таблице с прошлого запуска.
+            self.spilled.set()
+            for number in range(self.options['WORKERS']):
+                worker = threading.Thread(
+                    target=self.run,
+                    name=f'mail-queue-{number}',
+                    daemon=True,
+                )
+                worker.start()
+                self.workers.append(worker)
+
+    def send_mail(self, subject, message, from_email, recipient_list):
+        self.enqueue(EmailMessage(
+            subject, message, from_email, recipient_list
+        ))
+
+    def enqueue(self, message):
+        if not self.options['ASYNC']:
+            self.send_batch([message])
+            return
+        self.start()
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            logger.warning('Очередь писем переполнена, письмо сохранено в БД')
+            self.spill(message)
+
+    def spill(self, message):
+        QueuedMail.objects.create(
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email,
+            recipients='\n'.join(message.to),
+        )
+        self.spilled.set()
+
+    def drain_spilled(self):
+        """
+        Отправляет пачку писем из таблицы. Возвращает их количество, 0 -
+        таблица пуста. Строки удаляются в той же транзакции после
+        отправки: если отправить не удалось, письма остаются в таблице.
+        """
+        with transaction.atomic():
+            rows = list(QueuedMail.objects.select_for_update(
+                skip_locked=True
+            )[:self.options['BATCH_SIZE']])
+            if not rows:
+                return 0
+            self.send_batch([
+                EmailMessage(
+                    row.subject, row.body, row.from_email,
+                    row.recipients.split('\n'),
+                )
+                for row in rows
+            ])
+            QueuedMail.objects.filter(
+                pk__in=[row.pk for row in rows]
+            ).delete()
+        return len(rows)
+
+    def run_spilled(self):
+        try:
+            while self.drain_spilled():
+                pass
+            self.spilled.clear()
+        except Exception:
+            logger.exception('Не удалось отправить письма из БД')
+        finally:
+            # Поток не обслуживает запросы, соединение закрываем сами.
+            connection.close()
+
+    def run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                if self.spilled.is_set():
+                    self.run_spilled()
+                continue
+            while len(batch) < self.options['BATCH_SIZE']:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send_batch(batch)
+            except Exception:
+                logger.exception('Не удалось отправить %s писем', len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send_batch(self, messages):
+        retries = self.options['MAX_RETRIES']
+        for attempt in range(retries + 1):
+            try:
+                get_connection(fail_silently=False).send_messages(messages)
+                return
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(self.options['RETRY_BACKOFF'] * 2 ** attempt)
+
+    def flush(self, timeout=None):
+        """Ждет отправки всех писем из очереди. True, если успели."""
+        if self.queue is None:
+            return True
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(
+                lambda: not self.queue.unfinished_tasks, timeout
+            )
+
+
+mail_queue = MailQueue()
+# При остановке воркера даем очереди время дослать письма.
+atexit.register(lambda: mail_queue.flush(timeout=10))
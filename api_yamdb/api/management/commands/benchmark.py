@@ -0,0 +1,390 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+
+from ...authentication import get_token_for_user
+from ...cache import get_cache
+from ...instrumentation import RequestMetrics
+from ...mail import mail_queue
+from ...throttling import AuthIPThrottle, AuthUsernameThrottle
+from .loadtest import percentile
+
+User = get_user_model()
+
+BENCH_ADMIN = 'bench_admin'
+BENCH_USER = 'bench_user'
+
+# (имя, метод, путь, пользователь, тело запроса). Пути и тела
+# подставляются из контекста: {title}, {review}, {n} - номер итерации.
+SCENARIOS = (
+    ('categories-list', 'get', '/api/v1/categories/', None, None),
+    ('categories-create', 'post', '/api/v1/categories/', BENCH_ADMIN,
+     {'name': 'Bench {n}', 'slug': 'bench-{n}'}),
+    ('categories-delete', 'delete', '/api/v1/categories/{category}/',
+     BENCH_ADMIN, None),
+    ('genres-list', 'get', '/api/v1/genres/', None, None),
+    ('genres-create', 'post', '/api/v1/genres/', BENCH_ADMIN,
+     {'name': 'Bench {n}', 'slug': 'bench-{n}'}),
+    ('genres-delete', 'delete', '/api/v1/genres/{genre}/',
+     BENCH_ADMIN, None),
+    ('titles-list', 'get', '/api/v1/titles/', None, None),
+    ('titles-list-auth', 'get', '/api/v1/titles/', BENCH_USER, None),
+    ('titles-list-filtered', 'get',
+     '/api/v1/titles/?genre={genre}&category={category}', BENCH_USER, None),
+    ('titles-list-sparse', 'get', '/api/v1/titles/?fields=id,name,rating',
+     None, None),
+    ('titles-search', 'get', '/api/v1/titles/?search={title_name}',
+     BENCH_USER, None),
+    ('titles-detail', 'get', '/api/v1/titles/{title}/', None, None),
+    ('titles-detail-auth', 'get', '/api/v1/titles/{title}/', BENCH_USER,
+     None),
+    ('titles-stats', 'get', '/api/v1/titles/{title}/stats/', None, None),
+    ('titles-top', 'get', '/api/v1/titles/top/', None, None),
+    ('titles-top-filtered', 'get', '/api/v1/titles/top/?genre={genre}',
+     None, None),
+    ('titles-trending', 'get', '/api/v1/titles/trending/', None, None),
+    ('titles-create', 'post', '/api/v1/titles/', BENCH_ADMIN,
+     {'name': 'Bench {n}', 'year': 2000, 'genre': ['{genre}'],
+      'category': '{category}'}),
+    ('titles-update', 'patch', '/api/v1/titles/{title}/', BENCH_ADMIN,
+     {'name': 'Bench {n}'}),
+    ('titles-delete', 'delete', '/api/v1/titles/{quiet_title}/',
+     BENCH_ADMIN, None),
+    ('reviews-list', 'get', '/api/v1/titles/{title}/reviews/', BENCH_USER,
+     None),
+    ('reviews-list-cursor', 'get',
+     '/api/v1/titles/{title}/reviews/?pagination=cursor', BENCH_USER, None),
+    ('reviews-detail', 'get', '/api/v1/titles/{title}/reviews/{review}/',
+     BENCH_USER, None),
+    ('reviews-create', 'post', '/api/v1/titles/{title}/reviews/',
+     BENCH_USER, {'text': 'Bench {n}', 'score': 7}),
+    ('reviews-update', 'patch', '/api/v1/titles/{title}/reviews/{review}/',
+     BENCH_ADMIN, {'text': 'Bench {n}'}),
+    ('reviews-delete', 'delete',
+     '/api/v1/titles/{title}/reviews/{review}/', BENCH_ADMIN, None),
+    ('reviews-batch', 'post', '/api/v1/reviews/batch/', BENCH_USER,
+     [{'title': '{title}', 'text': 'Bench {n}', 'score': 5},
+      {'title': '{quiet_title}', 'text': 'Bench {n}', 'score': 6}]),
+    ('comments-list', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', BENCH_USER, None),
+    ('comments-detail', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     BENCH_USER, None),
+    ('comments-create', 'post',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', BENCH_USER,
+     {'text': 'Bench {n}'}),
+    ('comments-update', 'patch',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     BENCH_ADMIN, {'text': 'Bench {n}'}),
+    ('comments-delete', 'delete',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+     BENCH_ADMIN, None),
+    ('users-list', 'get', '/api/v1/users/', BENCH_ADMIN, None),
+    ('users-detail', 'get', f'/api/v1/users/{BENCH_USER}/', BENCH_ADMIN,
+     None),
+    ('users-create', 'post', '/api/v1/users/', BENCH_ADMIN,
+     {'username': 'bench_new{n}', 'email': 'bench_new{n}@example.com'}),
+    ('users-update', 'patch', f'/api/v1/users/{BENCH_USER}/', BENCH_ADMIN,
+     {'bio': 'Bench {n}'}),
+    ('users-delete', 'delete', f'/api/v1/users/{BENCH_USER}/', BENCH_ADMIN,
+     None),
+    ('users-me', 'get', '/api/v1/users/me/', BENCH_USER, None),
+    ('users-me-update', 'patch', '/api/v1/users/me/', BENCH_USER,
+     {'bio': 'Bench {n}'}),
+    ('auth-signup', 'post', '/api/v1/auth/signup/', None,
+     {'username': 'bench_signup{n}', 'email': 'bench_signup{n}@example.com'}),
+    ('auth-token', 'post', '/api/v1/auth/token/', None,
+     {'username': BENCH_USER, 'confirmation_code': '{confirmation_code}'}),
+    ('metrics', 'get', '/api/v1/metrics/', BENCH_ADMIN, None),
+    ('export', 'get', '/api/v1/export/genre/', BENCH_ADMIN, None),
+)
+
+# Метрики, рост которых выше допуска считается регрессией.
+LATENCY_METRICS = ('p50_ms', 'p95_ms')
+# Разница меньше этого порога - шум измерения, а не регрессия.
+LATENCY_FLOOR_MS = 1.0
+
+
+def fill(value, context):
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API route through the test client against the '
+        'current database and compare with a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=30,
+            help='Количество замеров на сценарий'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Количество прогревочных запросов на сценарий'
+        )
+        parser.add_argument(
+            '--alloc_iterations', type=int, default=3,
+            help='Количество запросов под tracemalloc на сценарий'
+        )
+        parser.add_argument(
+            '--only', action='append',
+            help='Запускать только сценарии, содержащие подстроку'
+        )
+        parser.add_argument(
+            '--output', type=str,
+            help='Файл для результатов в JSON'
+        )
+        parser.add_argument(
+            '--baseline', type=str,
+            help='Файл с эталонными результатами для сравнения'
+        )
+        parser.add_argument(
+            '--save_baseline', action='store_true',
+            help='Записать результаты в файл --baseline вместо сравнения'
+        )
+        parser.add_argument(
+            '--latency_tolerance', type=float, default=0.25,
+            help='Допустимый рост p50 и p95 относительно эталона'
+        )
+        parser.add_argument(
+            '--alloc_tolerance', type=float, default=0.1,
+            help='Допустимый рост пиковой памяти на запрос'
+        )
+
+    def get_context(self):
+        title = Title.objects.order_by('-rating_count', 'pk').first()
+        quiet_title = Title.objects.order_by('rating_count', 'pk').first()
+        if title is None:
+            raise CommandError(
+                'База пуста, сначала заполните ее командой generatedata'
+            )
+        review = Review.objects.filter(title=title).order_by('pk').first()
+        comment = (
+            Comment.objects.filter(review=review).order_by('pk').first()
+            if review else None
+        )
+        genre = title.genre.order_by('pk').first() or Genre.objects.first()
+        category = title.category or Category.objects.first()
+        if not (review and comment and genre and category):
+            raise CommandError(
+                'Для сценариев нужны произведение с отзывом и комментарием, '
+                'жанр и категория'
+            )
+        admin, _ = User.objects.get_or_create(
+            username=BENCH_ADMIN,
+            defaults={'email': f'{BENCH_ADMIN}@example.com', 'role': 'admin'}
+        )
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USER,
+            defaults={'email': f'{BENCH_USER}@example.com'}
+        )
+        return {
+            'title': title.pk,
+            'quiet_title': quiet_title.pk,
+            'title_name': title.name,
+            'review': review.pk,
+            'comment': comment.pk,
+            'genre': genre.slug,
+            'category': category.slug,
+            'confirmation_code': default_token_generator.make_token(user),
+            'tokens': {
+                BENCH_ADMIN: str(get_token_for_user(AccessToken, admin)),
+                BENCH_USER: str(get_token_for_user(AccessToken, user)),
+            },
+        }
+
+    def reset_throttles(self):
+        # Сценарии авторизации повторяются сотни раз с одного адреса,
+        # сбрасываем корзины, чтобы мерить сам обработчик, а не 429.
+        get_cache().delete_many([
+            AuthIPThrottle.cache_format % {
+                'scope': AuthIPThrottle.scope, 'ident': '127.0.0.1'
+            },
+            AuthUsernameThrottle.cache_format % {
+                'scope': AuthUsernameThrottle.scope, 'ident': BENCH_USER
+            },
+        ])
+
+    def request(self, client, scenario, context, number):
+        name, method, path, user, data = scenario
+        values = dict(context, n=number)
+        if user:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {context["tokens"][user]}'
+            )
+        else:
+            client.credentials()
+        if name.startswith('auth-'):
+            self.reset_throttles()
+        kwargs = {'format': 'json'} if data is not None else {}
+        metrics = RequestMetrics()
+        # Запросы на запись откатываются, чтобы каждый прогон работал
+        # с одними и теми же данными.
+        with transaction.atomic(), connection.execute_wrapper(metrics):
+            started = time.perf_counter()
+            response = getattr(client, method)(
+                fill(path, values), fill(data, values), **kwargs
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return response.status_code, elapsed, metrics.queries
+
+    def run_scenario(self, client, scenario, context, options):
+        number = 0
+        for _ in range(options['warmup']):
+            number += 1
+            self.request(client, scenario, context, number)
+        timings = []
+        queries = []
+        statuses = set()
+        for _ in range(options['iterations']):
+            number += 1
+            status, elapsed, count = self.request(
+                client, scenario, context, number
+            )
+            timings.append(elapsed * 1000)
+            queries.append(count)
+            statuses.add(status)
+        peaks = []
+        for _ in range(options['alloc_iterations']):
+            number += 1
+            tracemalloc.start()
+            try:
+                self.request(client, scenario, context, number)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        timings.sort()
+        return {
+            'method': scenario[1].upper(),
+            'path': scenario[2],
+            'status': sorted(statuses),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': max(queries),
+            'alloc_peak_kb': (
+                round(statistics.median(peaks) / 1024, 1) if peaks else None
+            ),
+        }
+
+    def compare(self, results, baseline, options):
+        regressions = []
+        for name, current in results.items():
+            reference = baseline.get(name)
+            if reference is None:
+                continue
+            if current['status'] != reference['status']:
+                regressions.append(
+                    f'{name}: статус {reference["status"]} -> '
+                    f'{current["status"]}'
+                )
+            if current['queries'] > reference['queries']:
+                regressions.append(
+                    f'{name}: запросов к БД {reference["queries"]} -> '
+                    f'{current["queries"]}'
+                )
+            for metric in LATENCY_METRICS:
+                limit = reference[metric] * (1 + options['latency_tolerance'])
+                if (current[metric] > limit and current[metric]
+                        - reference[metric] > LATENCY_FLOOR_MS):
+                    regressions.append(
+                        f'{name}: {metric} {reference[metric]} -> '
+                        f'{current[metric]}'
+                    )
+            if current['alloc_peak_kb'] and reference['alloc_peak_kb']:
+                limit = reference['alloc_peak_kb'] * (
+                    1 + options['alloc_tolerance']
+                )
+                if current['alloc_peak_kb'] > limit:
+                    regressions.append(
+                        f'{name}: пик памяти {reference["alloc_peak_kb"]} -> '
+                        f'{current["alloc_peak_kb"]} КБ'
+                    )
+        return regressions
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save_baseline требует --baseline')
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['only']
+            or any(part in scenario[0] for part in options['only'])
+        ]
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            context = self.get_context()
+            client = APIClient()
+            results = {}
+            for scenario in scenarios:
+                results[scenario[0]] = stats = self.run_scenario(
+                    client, scenario, context, options
+                )
+                self.stdout.write(
+                    f'{scenario[0]:<24} {stats["method"]:<6} '
+                    f'p50: {stats["p50_ms"]:>8} мс  '
+                    f'p95: {stats["p95_ms"]:>8} мс  '
+                    f'запросов: {stats["queries"]:>3}  '
+                    f'память: {stats["alloc_peak_kb"]} КБ  '
+                    f'статус: {stats["status"]}'
+                )
+            mail_queue.flush(timeout=10)
+        report = {
+            'meta': {
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'iterations': options['iterations'],
+                'titles': Title.objects.count(),
+                'reviews': Review.objects.count(),
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+        if not options['baseline']:
+            return
+        if options['save_baseline']:
+            with open(options['baseline'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(
+                f'Эталон записан в {options["baseline"]}'
+            ))
+            return
+        with open(options['baseline'], 'r', encoding='utf-8') as source:
+            baseline = json.load(source)
+        regressions = self.compare(
+            results, baseline['scenarios'], options
+        )
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f'Регрессий: {len(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
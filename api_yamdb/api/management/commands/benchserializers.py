@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from ...fastpath import ValuesPlan
+from ...renderers import FastJSONRenderer, orjson
+from ...serializers import (CategorySerializer, GenreSerializer,
+                            TitleSerializerGet)
+from ...views import CategoryViewSet, GenreViewSet, TitleViewSet
+
+# (имя, представление, сериализатор): выборка и сериализатор те же, что
+# у списков /titles/, /categories/ и /genres/.
+TARGETS = (
+    ('titles', TitleViewSet, TitleSerializerGet),
+    ('categories', CategoryViewSet, CategorySerializer),
+    ('genres', GenreViewSet, GenreSerializer),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ModelSerializer with JSONRenderer against the values() '
+        'fast path for title, category and genre lists'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=500,
+            help='Количество строк в одном ответе'
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Количество замеров на способ'
+        )
+
+    def measure(self, build, iterations):
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            content = build()
+            timings.append(time.perf_counter() - started)
+        return content, statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        fast_renderer = FastJSONRenderer()
+        self.stdout.write(
+            f'orjson: {"есть" if orjson is not None else "не установлен"}'
+        )
+        for name, view, serializer_class in TARGETS:
+            queryset = view.queryset.all()
+            plan = ValuesPlan.compile(
+                serializer_class(), serializer_class.Meta.model
+            )
+            if plan is None:
+                raise CommandError(
+                    f'{name}: сериализатор не сводится к .values()'
+                )
+
+            def standard():
+                return JSONRenderer().render(
+                    serializer_class(queryset.all()[:rows], many=True).data
+                )
+
+            def fast():
+                return fast_renderer.render(plan.render(
+                    queryset.prefetch_related(None).values(
+                        *plan.paths
+                    )[:rows]
+                ))
+
+            expected, standard_ms = self.measure(
+                standard, options['iterations']
+            )
+            content, fast_ms = self.measure(fast, options['iterations'])
+            if content != expected:
+                raise CommandError(f'{name}: ответы не совпадают')
+            self.stdout.write(
+                f'{name:<12} строк: {min(queryset.count(), rows):>5}  '
+                f'сериализатор: {standard_ms:>8.2f} мс  '
+                f'values: {fast_ms:>8.2f} мс  '
+                f'ускорение: {standard_ms / fast_ms:>5.1f}x'
+            )
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/',
+    '/api/v1/titles/?page=2',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/?pagination=cursor',
+)
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    index = min(int(len(values) * share), len(values) - 1)
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test catalog and review endpoints of a running server, '
+        'e.g. runserver vs gunicorn'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', type=str, help='http://host:port')
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность теста в секундах'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Количество одновременных клиентов'
+        )
+        parser.add_argument(
+            '--title_id', type=int, default=1,
+            help='Произведение для детальных эндпоинтов'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Проверяемый путь, можно указать несколько раз'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести результат в JSON'
+        )
+
+    def run_client(self, urls, deadline, results, lock):
+        session = requests.Session()
+        latencies = {url: [] for url in urls}
+        errors = {url: 0 for url in urls}
+        position = 0
+        while time.monotonic() < deadline:
+            url = urls[position % len(urls)]
+            position += 1
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+            latencies[url].append(time.perf_counter() - started)
+            errors[url] += failed
+        with lock:
+            for url in urls:
+                results[url]['latencies'].extend(latencies[url])
+                results[url]['errors'] += errors[url]
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        paths = options['paths'] or DEFAULT_PATHS
+        urls = [
+            base_url + path.format(title_id=options['title_id'])
+            for path in paths
+        ]
+        results = {url: {'latencies': [], 'errors': 0} for url in urls}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            futures = []
+            for client in range(options['concurrency']):
+                # Клиенты начинают с разных путей, чтобы нагрузка
+                # распределялась по эндпоинтам равномерно.
+                shifted = urls[client % len(urls):] + urls[:client % len(urls)]
+                futures.append(executor.submit(
+                    self.run_client, shifted, deadline, results, lock
+                ))
+        # Упавший клиент не добавил свои замеры, отчет без них исказил бы
+        # пропускную способность.
+        failures = [
+            future.exception() for future in futures
+            if future.exception() is not None
+        ]
+        if failures:
+            raise CommandError(
+                f'Клиентов завершилось с ошибкой: {len(failures)} из '
+                f'{len(futures)}. Первая ошибка: {failures[0]!r}'
+            ) from failures[0]
+        report = {'duration': options['duration'], 'endpoints': {}}
+        total = 0
+        for url, result in results.items():
+            latencies = sorted(result['latencies'])
+            total += len(latencies)
+            report['endpoints'][url] = {
+                'requests': len(latencies),
+                'errors': result['errors'],
+                'rps': round(len(latencies) / options['duration'], 1),
+                'p50_ms': self.ms(percentile(latencies, 0.5)),
+                'p95_ms': self.ms(percentile(latencies, 0.95)),
+                'p99_ms': self.ms(percentile(latencies, 0.99)),
+            }
+        report['rps'] = round(total / options['duration'], 1)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for url, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'{url}\n'
+                f'  запросов: {stats["requests"]}, '
+                f'ошибок: {stats["errors"]}, rps: {stats["rps"]}, '
+                f'p50: {stats["p50_ms"]} мс, p95: {stats["p95_ms"]} мс, '
+                f'p99: {stats["p99_ms"]} мс'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего: {total} запросов, {report["rps"]} запросов/с'
+        ))
+
+    @staticmethod
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
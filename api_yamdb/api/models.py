@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class QueuedMail(models.Model):
+    """Письмо, которое не поместилось в очередь в памяти."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    # Адреса получателей через перевод строки.
+    recipients = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('id',)
@@ -0,0 +1,49 @@
+from django.shortcuts import get_object_or_404
+
+
+class NestedViewMixin:
+    """
+    Вложенный ресурс: отзывы произведения, комментарии к отзыву.
+
+    Родитель ищется не больше одного раза за запрос и запоминается на
+    представлении. Список и создание проверяют существование родителя,
+    дочерние объекты фильтруются по значению внешнего ключа без join.
+    Для отдельного объекта родитель не загружается: фильтр child_lookups
+    по параметрам URL сам вернет 404 для чужого или несуществующего
+    родителя.
+    """
+    parent_model = None
+    # Имя внешнего ключа на родителя в дочерней модели.
+    parent_field = None
+    # Поле родителя -> параметр URL.
+    parent_lookups = {}
+    # Поле дочерней модели -> параметр URL.
+    child_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model,
+                **{
+                    lookup: self.kwargs[kwarg]
+                    for lookup, kwarg in self.parent_lookups.items()
+                }
+            )
+        return self._parent
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            return queryset.filter(**{
+                f'{self.parent_field}_id': self.get_parent().pk
+            })
+        return queryset.filter(**{
+            lookup: self.kwargs[kwarg]
+            for lookup, kwarg in self.child_lookups.items()
+        })
+
+    def perform_create(self, serializer):
+        serializer.save(
+            author=self.request.user,
+            **{self.parent_field: self.get_parent()}
+        )
@@ -0,0 +1,123 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, Cursor,
+                                       CursorPagination, PageNumberPagination)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Постраничный вывод по ключу (pub_date, id).
+
+    Курсор хранит ключ граничной записи, поэтому выборка любой страницы
+    сводится к поиску по индексу без COUNT(*) и OFFSET.
+    """
+    ordering = ('pub_date', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        positioned = (
+            self.cursor is not None and self.cursor.position is not None
+        )
+        if positioned:
+            queryset = self.filter_position(
+                queryset, *self.parse_position(self.cursor.position), reverse
+            )
+        ordering = ('-pub_date', '-id') if reverse else self.ordering
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = positioned, has_more
+        else:
+            self.has_next, self.has_previous = has_more, positioned
+        return self.page
+
+    def filter_position(self, queryset, pub_date, pk, reverse=False):
+        """
+        Записи после ключа (pub_date, pk). Условие OR само по себе не
+        ограничивает диапазон индекса (..., pub_date, id), поэтому к нему
+        добавлена граница pub_date >= ключа: поиск начинается с нужного
+        места индекса, и страница N стоит столько же, сколько первая.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        return queryset.filter(
+            Q(**{f'pub_date__{lookup}e': pub_date}),
+            Q(**{f'pub_date__{lookup}': pub_date})
+            | Q(pub_date=pub_date, **{f'id__{lookup}': pk}),
+        )
+
+    def parse_position(self, position):
+        try:
+            pub_date, pk = position.split('|')
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError(position)
+            return pub_date, int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_position(self, instance):
+        return f'{instance.pub_date.isoformat()}|{instance.pk}'
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False, position=self.get_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=True, position=self.get_position(self.page[0])
+        ))
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    По умолчанию работает как PageNumberPagination. Постраничный вывод
+    по ключу включается параметром ?pagination=cursor, ссылки next и
+    previous дальше передают курсор сами.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def __init__(self):
+        self.page_number = PageNumberPagination()
+        self.keyset = KeysetPagination()
+        self.active = self.page_number
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__['active'], name)
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.keyset_mode
+            or self.keyset.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.active = self.keyset
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number.get_schema_operation_parameters(view)
+            + self.keyset.get_schema_operation_parameters(view)
+        )
@@ -0,0 +1,116 @@
+"""
+Бэкенд PostgreSQL с пулом соединений внутри процесса.
+
+Подключается через ENGINE = 'api.pooled_postgresql'. Закрытие соединения
+Django возвращает его в пул, поэтому бэкенд используют с CONN_MAX_AGE = 0:
+соединение отдается в пул после каждого запроса и переиспользуется
+потоками воркера. Размеры пула задаются ключами POOL_MIN_SIZE (сколько
+простаивающих соединений держать) и POOL_MAX_SIZE в настройках БД. Когда
+все POOL_MAX_SIZE соединений заняты, поток ждет освободившееся до
+POOL_TIMEOUT секунд.
+"""
+import threading
+import time
+import weakref
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+from ..instrumentation import connection_stats
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Когда соединение из пула в следующий раз нужно проверить SELECT 1.
+_health_check_due = weakref.WeakKeyDictionary()
+
+
+class CountingConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Считает физические подключения и при исчерпании пула ждет
+    освободившееся соединение до timeout секунд вместо немедленного
+    PoolError.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=None, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self.timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def _connect(self, key=None):
+        connection_stats.record_physical_open()
+        return super()._connect(key)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pool.PoolError('connection pool exhausted')
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self._slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = CountingConnectionPool(
+                    self.settings_dict.get('POOL_MIN_SIZE', 1),
+                    self.settings_dict.get('POOL_MAX_SIZE', 10),
+                    timeout=self.settings_dict.get('POOL_TIMEOUT'),
+                    **conn_params
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        connection = connection_pool.getconn()
+        if not self.is_pooled_connection_usable(connection):
+            connection_pool.putconn(connection, close=True)
+            connection = connection_pool.getconn()
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def is_pooled_connection_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            return True
+        # Как и check_connections_health, соединение проверяется не чаще
+        # раза в CONN_HEALTH_CHECK_INTERVAL секунд.
+        now = time.monotonic()
+        if now < _health_check_due.get(connection, 0):
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            # У нового соединения autocommit выключен, и проверка открывает
+            # транзакцию. Внутри нее psycopg2 не дает сменить autocommit и
+            # уровень изоляции.
+            connection.rollback()
+        except base.Database.Error:
+            return False
+        _health_check_due[connection] = now + self.settings_dict.get(
+            'CONN_HEALTH_CHECK_INTERVAL', 0
+        )
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # Пул сам откатывает незавершенную транзакцию и закрывает
+            # лишние или сломанные соединения.
+            _pools[self.alias].putconn(self.connection)
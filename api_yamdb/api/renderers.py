@@ -0,0 +1,62 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа, которые json и orjson записывают по-разному: с экспонентой и
+# меньше 1e-4. Совпадение внутри строки только отключает быстрый путь.
+STDLIB_NUMBERS = re.compile(rb'\d[eE]|(?<![\d.])0\.0000')
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def unsupported(value):
+    raise TypeError(type(value).__name__)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен.
+
+    Результат побайтно совпадает с JSONRenderer. С отступами, ensure_ascii
+    и для значений, которые orjson записал бы иначе (даты, ленивые строки,
+    нестроковые ключи, числа с экспонентой), ответ собирает стандартный
+    json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=unsupported,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                ),
+            )
+        except TypeError:
+            ret = None
+        if ret is None or STDLIB_NUMBERS.search(ret):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+            PARAGRAPH_SEPARATOR, b'\\u2029'
+        )
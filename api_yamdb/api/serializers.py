@@ -1,17 +1,30 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title, TitleStats
+from reviews.rankings import trending_score
+
+from .catalog import (CatalogRelatedField, CatalogRelatedListField,
+                      CatalogSlugField, category_catalog, genre_catalog)
+from .sparse import SparseFieldsetMixin
 
 User = get_user_model()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    author = serializers.SlugRelatedField(
-        slug_field='username',
-        read_only=True,
+class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('username', 'first_name', 'last_name', 'bio')
+
+
+def author_fields():
+    """Автор отзыва или комментария: username или вложенный объект."""
+    return (
+        serializers.SlugRelatedField(slug_field='username', read_only=True),
+        AuthorSerializer(read_only=True),
     )
 
+
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     def validate(self, data):
         request = self.context.get('request')
         author = request.user
@@ -26,17 +39,20 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
+        expandable_fields = {'author': author_fields()}
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    author = serializers.SlugRelatedField(
-        slug_field='username',
-        read_only=True,
-    )
+class ReviewBatchItemSerializer(serializers.Serializer):
+    title = serializers.IntegerField(min_value=1)
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
 
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+        expandable_fields = {'author': author_fields()}
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -53,33 +69,85 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleSerializerGet(serializers.ModelSerializer):
+class TitleSerializerGet(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Объявлены ради порядка полей, сами поля берутся из expandable_fields.
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.SerializerMethodField(read_only=True)
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+        # Без развертывания категория и жанры отдаются слагами. Объекты
+        # берутся из каталога, из БД читаются только их id.
+        expandable_fields = {
+            'category': (
+                CatalogRelatedField(category_catalog, source='category_id'),
+                CatalogRelatedField(
+                    category_catalog, CategorySerializer,
+                    source='category_id',
+                ),
+            ),
+            'genre': (
+                CatalogRelatedListField(
+                    genre_catalog, 'genre_id', source='genres'
+                ),
+                CatalogRelatedListField(
+                    genre_catalog, 'genre_id', GenreSerializer,
+                    source='genres',
+                ),
+            ),
+        }
+        default_expand = ('category', 'genre')
+
+
+class TitleRankingSerializer(TitleSerializerGet):
+    bayesian_score = serializers.FloatField(
+        source='ranking.bayesian_score', read_only=True
+    )
+    trending_score = serializers.SerializerMethodField()
 
-    def get_rating(self, obj):
-        return Review.objects.filter(title=obj).aggregate(
-            Avg('score'))['score__avg']
+    class Meta(TitleSerializerGet.Meta):
+        sparse_sources = {'trending_score': ('ranking.trending_key',)}
+
+    def get_trending_score(self, obj):
+        return trending_score(obj.ranking.trending_key)
 
 
 class TitleSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(), slug_field='slug'
-    )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(), slug_field='slug', many=True
-    )
+    category = CatalogSlugField(category_catalog)
+    genre = CatalogSlugField(genre_catalog, many=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
         model = Title
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    rating = serializers.SerializerMethodField()
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = (
+            'title',
+            'review_count',
+            'comment_count',
+            'last_activity',
+            'rating',
+            'scores',
+        )
+
+    def get_rating(self, obj):
+        if not obj.review_count:
+            return None
+        total = sum(score * count for score, count in obj.scores.items())
+        return total / obj.review_count
+
+    def get_scores(self, obj):
+        return {str(score): count for score, count in obj.scores.items()}
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
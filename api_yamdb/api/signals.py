@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.signals import rows_loaded
+
+from .authentication import user_cache
+from .cache import bump_generation
+from .catalog import CATALOGS
+from .connections import check_connections_health
+from .instrumentation import connection_stats
+from .serializers import AuthorSerializer
+
+User = get_user_model()
+
+CACHED_MODELS = (Category, Genre, Title, TitleGenre, Review, Comment)
+
+
+def bump_now_and_on_commit(model):
+    bump_generation(model)
+    # Повторная инвалидация после коммита отсекает страницы, которые
+    # параллельные запросы успели закешировать до фиксации транзакции.
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_generation(model))
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    bump_now_and_on_commit(sender)
+
+
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_now_and_on_commit(TitleGenre)
+
+
+def remember_author_changes(sender, instance, update_fields=None,
+                            raw=False, **kwargs):
+    """
+    Отмечает, изменились ли поля автора, которые отдаются в отзывах и
+    комментариях: вход в систему, смена роли или кода подтверждения их
+    ETag не меняют.
+    """
+    fields = AuthorSerializer.Meta.fields
+    instance._author_changed = False
+    if instance._state.adding or raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    stored = sender._default_manager.filter(pk=instance.pk).values_list(
+        *fields
+    ).first()
+    instance._author_changed = stored != tuple(
+        getattr(instance, field) for field in fields
+    )
+
+
+def invalidate_author_responses(sender, instance, **kwargs):
+    if instance.__dict__.pop('_author_changed', False):
+        bump_now_and_on_commit(sender)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+    rows_loaded.connect(invalidate_cached_responses, sender=model)
+m2m_changed.connect(invalidate_title_genres, sender=TitleGenre)
+pre_save.connect(remember_author_changes, sender=User)
+post_save.connect(invalidate_author_responses, sender=User)
+post_delete.connect(invalidate_cached_responses, sender=User)
+rows_loaded.connect(invalidate_cached_responses, sender=User)
+
+connection_created.connect(connection_stats.record_connect)
+request_started.connect(check_connections_health)
+post_save.connect(invalidate_cached_user, sender=User)
+post_delete.connect(invalidate_cached_user, sender=User)
+
+for catalog in CATALOGS:
+    request_started.connect(catalog.begin_request, weak=False)
+    request_finished.connect(catalog.end_request, weak=False)
+    post_save.connect(catalog.invalidate, sender=catalog.model, weak=False)
+    post_delete.connect(catalog.invalidate, sender=catalog.model, weak=False)
+    rows_loaded.connect(catalog.invalidate, sender=catalog.model, weak=False)
@@ -0,0 +1,222 @@
+import copy
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .catalog import CatalogRelatedField, CatalogRelatedListField
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def fieldset_key(serializer_class, context):
+    """Ключ для кеша планов: класс сериализатора, fields и expand."""
+    return (serializer_class,) + tuple(
+        frozenset(context[param]) if param in context else None
+        for param in ('fields', 'expand')
+    )
+
+
+class SparseFieldsetMixin:
+    """
+    Сериализатор с выбором полей.
+
+    context['fields'] - поля верхнего уровня, которые попадут в ответ,
+    context['expand'] - связи, которые отдаются вложенными объектами.
+
+    Meta.expandable_fields: имя -> (свернутое поле, развернутое поле).
+    Meta.default_expand: связи, развернутые без параметра expand.
+    Meta.sparse_sources: имя SerializerMethodField -> пути полей модели
+    через точку, которые читает метод.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expand = self.context.get('expand')
+        if expand is None:
+            expand = getattr(self.Meta, 'default_expand', ())
+        unknown = set(expand) - set(expandable)
+        if unknown:
+            raise ValidationError({
+                'expand': f'Нельзя развернуть: {", ".join(sorted(unknown))}'
+            })
+        for name, (collapsed, expanded) in expandable.items():
+            fields[name] = copy.deepcopy(
+                expanded if name in expand else collapsed
+            )
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        unknown = set(requested) - set(fields)
+        if unknown:
+            raise ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        for name in list(fields):
+            if name not in requested:
+                del fields[name]
+        return fields
+
+
+class QuerysetPlan:
+    """
+    Поля модели для only(), связи для select_related() и prefetch_related(),
+    которые читает сериализатор. for_serializer возвращает None, если
+    источник какого-то поля определить нельзя: тогда запрос не меняется.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.only = {model._meta.pk.name}
+        self.select = set()
+        self.prefetch = {}
+
+    @classmethod
+    def for_serializer(cls, serializer, model):
+        plan = cls(model)
+        if not plan.add_serializer(serializer, model, ''):
+            return None
+        return plan
+
+    def add_serializer(self, serializer, model, prefix):
+        meta = getattr(serializer, 'Meta', None)
+        sources = getattr(meta, 'sparse_sources', {})
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in sources:
+                    return False
+                if not all(
+                    self.add_source(model, source.split('.'), None, prefix)
+                    for source in sources[name]
+                ):
+                    return False
+            elif isinstance(field, CatalogRelatedField):
+                # Сам объект придет из каталога, нужен только ключ.
+                foreign_key = model._meta.get_field(field.source)
+                self.only.add(prefix + foreign_key.name)
+            elif isinstance(field, CatalogRelatedListField):
+                if prefix:
+                    return False
+                self.add_catalog_prefetch(model, field)
+            elif not self.add_source(
+                model, field.source_attrs, field, prefix
+            ):
+                return False
+        return True
+
+    def add_catalog_prefetch(self, model, field):
+        relation = model._meta.get_field(field.source)
+        plan = type(self)(relation.related_model)
+        plan.only.update((
+            relation.field.name,
+            relation.related_model._meta.get_field(field.related_field).name,
+        ))
+        self.prefetch[field.source] = plan
+
+    def add_source(self, model, attrs, field, prefix):
+        if not attrs:
+            return False
+        try:
+            model_field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return False
+        path = prefix + attrs[0]
+        if not model_field.is_relation:
+            self.only.add(path)
+            return len(attrs) == 1
+        related_model = model_field.related_model
+        if model_field.many_to_many or model_field.one_to_many:
+            if prefix or len(attrs) > 1:
+                return False
+            return self.add_prefetch(path, related_model, field)
+        if model_field.concrete:
+            self.only.add(path)
+        if len(attrs) > 1:
+            self.select.add(path)
+            return self.add_source(
+                related_model, attrs[1:], field, f'{path}__'
+            )
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return model_field.concrete
+        self.select.add(path)
+        return self.add_target(field, related_model, f'{path}__')
+
+    def add_target(self, field, model, prefix):
+        """Поля связанного объекта, которые читает поле сериализатора."""
+        if isinstance(field, serializers.Serializer):
+            return self.add_serializer(field, model, prefix)
+        if isinstance(field, serializers.SlugRelatedField):
+            return self.add_source(
+                model, field.slug_field.split('__'), None, prefix
+            )
+        return False
+
+    def add_prefetch(self, path, model, field):
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        elif isinstance(field, serializers.ManyRelatedField):
+            field = field.child_relation
+        plan = type(self)(model)
+        if not plan.add_target(field, model, ''):
+            return False
+        self.prefetch[path] = plan
+        return True
+
+    def apply(self, queryset):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*(
+                Prefetch(
+                    path,
+                    queryset=plan.apply(plan.model._default_manager.all()),
+                )
+                for path, plan in self.prefetch.items()
+            ))
+        return queryset.only(*self.only)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Передает сериализатору ?fields= и ?expand= и для безопасных запросов
+    загружает из БД только поля и связи, которые попадут в ответ.
+
+    sparse_required_fields - поля модели, которые нужны представлению
+    помимо сериализатора, например ключ постраничного вывода.
+    """
+    sparse_required_fields = ()
+    queryset_plans = {}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in SAFE_METHODS:
+            for param in ('fields', 'expand'):
+                value = self.request.query_params.get(param)
+                if value is not None:
+                    context[param] = parse_names(value)
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        key = (type(self),) + fieldset_key(serializer_class, context)
+        if key not in self.queryset_plans:
+            plan = QuerysetPlan.for_serializer(
+                serializer_class(context=context), queryset.model
+            )
+            if plan is not None:
+                plan.only.update(self.sparse_required_fields)
+            self.queryset_plans[key] = plan
+        plan = self.queryset_plans[key]
+        if plan is None:
+            return queryset
+        return plan.apply(queryset)
@@ -0,0 +1,66 @@
+from api.authentication import get_token_for_user, user_cache
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='admin@mail.ru', role='admin'
+        )
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        token = get_token_for_user(AccessToken, user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_token_contains_role_claims(self):
+        token = get_token_for_user(AccessToken, self.admin)
+        self.assertEqual(token['role'], 'admin')
+        self.assertEqual(token['username'], 'admin')
+        self.assertIs(token['is_active'], True)
+
+    def test_permission_check_uses_cached_user(self):
+        client = self.client_for(self.user)
+        with self.assertNumQueries(1):
+            response = client.post('/api/v1/genres/', {})
+        self.assertEqual(response.status_code, 403)
+        with self.assertNumQueries(0):
+            response = client.post('/api/v1/genres/', {})
+        self.assertEqual(response.status_code, 403)
+
+    def test_role_change_invalidates_cached_user(self):
+        client = self.client_for(self.user)
+        client.post('/api/v1/genres/', {})
+
+        admin_client = self.client_for(self.admin)
+        response = admin_client.patch(
+            f'/api/v1/users/{self.user.username}/', {'role': 'admin'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = client.post(
+            '/api/v1/genres/', {'name': 'Drama', 'slug': 'drama'}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_inactive_user_is_rejected(self):
+        client = self.client_for(self.user)
+        client.get('/api/v1/users/me/')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user_cache.invalidate(self.user.pk)
+        response = client.get('/api/v1/users/me/')
+        self.assertEqual(response.status_code, 401)
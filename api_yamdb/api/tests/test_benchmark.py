@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+OPTIONS = {
+    'iterations': 2,
+    'warmup': 0,
+    'alloc_iterations': 1,
+    'only': ['titles-list', 'reviews-create', 'auth-token'],
+}
+
+
+class BenchmarkCommandTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generatedata', titles=5, users=10, reviews=20, comments=10,
+            categories=2, genres=2, stdout=StringIO()
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baseline = os.path.join(directory.name, 'baseline.json')
+        self.output = os.path.join(directory.name, 'results.json')
+
+    def benchmark(self, **options):
+        call_command(
+            'benchmark', baseline=self.baseline, stdout=StringIO(),
+            **OPTIONS, **options
+        )
+
+    def test_records_and_compares_with_baseline(self):
+        self.benchmark(save_baseline=True, output=self.output)
+        with open(self.output, encoding='utf-8') as source:
+            scenarios = json.load(source)['scenarios']
+        self.assertEqual(
+            set(scenarios),
+            {'titles-list', 'titles-list-auth', 'titles-list-filtered',
+             'titles-list-sparse',
+             'reviews-create', 'auth-token'}
+        )
+        self.assertEqual(scenarios['reviews-create']['status'], [201])
+        self.assertEqual(scenarios['auth-token']['status'], [200])
+        self.assertIsNotNone(scenarios['titles-list']['alloc_peak_kb'])
+        self.benchmark(latency_tolerance=100, alloc_tolerance=100)
+
+    def test_extra_queries_are_reported(self):
+        self.benchmark(save_baseline=True)
+        with open(self.baseline, encoding='utf-8') as source:
+            baseline = json.load(source)
+        baseline['scenarios']['reviews-create']['queries'] -= 1
+        with open(self.baseline, 'w', encoding='utf-8') as output:
+            json.dump(baseline, output)
+        with self.assertRaisesMessage(CommandError, 'Регрессий: 1'):
+            self.benchmark(latency_tolerance=100, alloc_tolerance=100)
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Genre, Review, Title, TitleGenre
+
+User = get_user_model()
+
+
+class ResponseCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.genre = Genre.objects.create(name='Drama', slug='drama')
+        cls.title = Title.objects.create(name='Title', year=2000)
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_anonymous_list_is_cached(self):
+        self.client.get('/api/v1/genres/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/genres/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_query_string_is_part_of_key(self):
+        self.client.get('/api/v1/genres/')
+        response = self.client.get('/api/v1/genres/', {'search': 'nothing'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_write_invalidates_cached_pages(self):
+        self.client.get('/api/v1/genres/')
+        Genre.objects.create(name='Comedy', slug='comedy')
+        response = self.client.get('/api/v1/genres/')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_related_writes_invalidate_title_pages(self):
+        url = f'/api/v1/titles/{self.title.id}/'
+        self.client.get(url)
+        TitleGenre.objects.create(title=self.title, genre=self.genre)
+        response = self.client.get(url)
+        self.assertEqual(response.data['genre'][0]['slug'], 'drama')
+
+        Review.objects.create(
+            title=self.title, author=self.user, text='text', score=8
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.data['rating'], 8.0)
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_authenticate(self.user)
+        self.client.get('/api/v1/genres/', {'search': 'Drama'})
+        # Список без поиска отдается из каталога, поэтому нужен поиск.
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/genres/', {'search': 'Drama'})
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+
+from ..cache import bump_generation
+from ..catalog import genre_catalog, load_catalogs
+
+User = get_user_model()
+
+
+class CatalogTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='admin@mail.ru', role='admin'
+        )
+        Category.objects.create(name='Кино', slug='movie')
+        for i in range(3):
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+
+    def setUp(self):
+        cache.clear()
+        load_catalogs()
+        self.client = APIClient()
+
+    def test_lists_are_served_from_memory(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/genres/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [genre['slug'] for genre in response.data['results']],
+            ['genre-0', 'genre-1', 'genre-2'],
+        )
+
+    def test_title_write_resolves_slugs_from_memory(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/titles/', {
+                'name': 'Title',
+                'year': 2000,
+                'category': 'movie',
+                'genre': ['genre-2', 'genre-0', 'genre-1'],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Ни одного поиска по slug, остаются только запросы самой записи.
+        self.assertFalse([
+            query['sql'] for query in queries
+            if '"slug" =' in query['sql'] or '"slug" IN' in query['sql']
+        ])
+        title = Title.objects.get(name='Title')
+        self.assertEqual(title.category.slug, 'movie')
+        self.assertEqual(title.genre.count(), 3)
+
+    def test_unknown_slug_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/api/v1/titles/', {
+            'name': 'Title', 'year': 2000, 'genre': ['missing'],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('genre', response.data)
+
+    def test_version_bump_reloads_catalog(self):
+        # Запись в другом процессе: строки без сигналов, только счетчик
+        # поколений в общем кеше.
+        Genre.objects.filter(slug='genre-0').update(name='Драма')
+        self.assertEqual(genre_catalog.get_by_slug('genre-0').name, 'Жанр 0')
+        bump_generation(Genre)
+        self.assertEqual(genre_catalog.get_by_slug('genre-0').name, 'Драма')
+
+    def test_write_invalidates_catalog(self):
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = self.client.get('/api/v1/genres/')
+        self.assertEqual(response.data['count'], 4)
+        response = self.client.get('/api/v1/genres/', {'search': 'Комедия'})
+        self.assertEqual(response.data['count'], 1)
@@ -0,0 +1,125 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Title', year=2000)
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+        cls.review = Review.objects.create(
+            title=cls.title, author=cls.user, text='text', score=8
+        )
+        cls.reviews_url = f'/api/v1/titles/{cls.title.id}/reviews/'
+        cls.comments_url = f'{cls.reviews_url}{cls.review.id}/comments/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_matching_etag_returns_304_without_queries(self):
+        for url in (
+            f'/api/v1/titles/{self.title.id}/',
+            self.reviews_url,
+            f'{self.reviews_url}{self.review.id}/',
+            self.comments_url,
+        ):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1)
+    def test_not_modified_response_is_instrumented(self):
+        etag = self.client.get(self.reviews_url)['ETag']
+        response = self.client.get(self.reviews_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Server-Timing', response)
+
+    def test_if_modified_since(self):
+        self.client.get(self.reviews_url)
+        later = time.time() + 2
+        with mock.patch('api.cache.time.time', return_value=later):
+            last_modified = self.client.get(
+                self.reviews_url
+            )['Last-Modified']
+            response = self.client.get(
+                self.reviews_url, HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_in_same_second_is_not_hidden_by_last_modified(self):
+        self.client.get(self.reviews_url)
+        Review.objects.filter(pk=self.review.pk).update(text='new')
+        Review.objects.get(pk=self.review.pk).save()
+        response = self.client.get(
+            self.reviews_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time())
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(response.data['results'][0]['text'], 'new')
+
+    def test_deleted_parent_returns_404_for_old_etag(self):
+        title = Title.objects.create(name='Empty', year=2000)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        review = Review.objects.create(
+            title=self.title, author=User.objects.create(
+                username='other', email='o@mail.ru'
+            ), text='text', score=5
+        )
+        comments_url = f'{self.reviews_url}{review.id}/comments/'
+        for url, parent in ((reviews_url, title), (comments_url, review)):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                parent.delete()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 404)
+
+    def test_login_and_role_change_keep_etag(self):
+        etag = self.client.get(self.reviews_url)['ETag']
+        user = User.objects.get(pk=self.user.pk)
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        user.role = 'moderator'
+        user.save()
+        response = self.client.get(self.reviews_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_author_change_changes_etag(self):
+        etag = self.client.get(self.reviews_url)['ETag']
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        response = self.client.get(self.reviews_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['author'], 'renamed')
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(self.comments_url)['ETag']
+        Comment.objects.create(review=self.review, author=self.user, text='c')
+        response = self.client.get(
+            self.comments_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_string_is_part_of_etag(self):
+        etag = self.client.get(self.reviews_url)['ETag']
+        response = self.client.get(
+            self.reviews_url, {'page': 1}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..connections import check_connections_health
+
+
+class HealthCheckTest(SimpleTestCase):
+
+    def run_check(self, connection):
+        with mock.patch(
+            'api.connections.connections',
+            mock.Mock(all=mock.Mock(return_value=[connection])),
+        ):
+            check_connections_health()
+
+    def make_connection(self, usable=True):
+        return SimpleNamespace(
+            connection=object(),
+            settings_dict={
+                'CONN_HEALTH_CHECKS': True,
+                'CONN_HEALTH_CHECK_INTERVAL': 60,
+            },
+            in_atomic_block=False,
+            is_usable=mock.Mock(return_value=usable),
+            close=mock.Mock(),
+        )
+
+    def test_connection_is_checked_once_per_interval(self):
+        connection = self.make_connection()
+        for _ in range(3):
+            self.run_check(connection)
+        connection.is_usable.assert_called_once_with()
+        connection.close.assert_not_called()
+
+    def test_broken_connection_is_closed(self):
+        connection = self.make_connection(usable=False)
+        self.run_check(connection)
+        connection.close.assert_called_once_with()
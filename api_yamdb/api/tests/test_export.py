@@ -0,0 +1,62 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+
+class ExportViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='admin@mail.ru', role='admin'
+        )
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+        title = Title.objects.create(name='Title', year=2000)
+        cls.review = Review.objects.create(
+            title=title, author=cls.user, text='Текст', score=7
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        return self.client.get(url)
+
+    def test_only_admin_can_export(self):
+        response = self.get(self.user, '/api/v1/export/review/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_csv_uses_import_layout(self):
+        response = self.get(self.admin, '/api/v1/export/review/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,title_id,text,author,score,pub_date')
+        pub_date = self.review.pub_date.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        self.assertEqual(
+            lines[1],
+            f'{self.review.id},{self.review.title_id},Текст,'
+            f'{self.user.id},7,{pub_date}'
+        )
+
+    def test_ndjson(self):
+        response = self.get(
+            self.admin, '/api/v1/export/users/?output=ndjson'
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['username'] for row in rows], ['admin', 'user']
+        )
+
+    def test_unknown_dataset(self):
+        response = self.get(self.admin, '/api/v1/export/unknown/')
+        self.assertEqual(response.status_code, 404)
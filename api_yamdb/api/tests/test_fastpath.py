@@ -0,0 +1,104 @@
+import datetime
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title, TitleGenre
+
+from ..catalog import load_catalogs
+from ..renderers import FastJSONRenderer
+
+
+class FastListTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Кино', slug='movie')
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in (2, 1, 3)
+        ]
+        for i in range(7):
+            title = Title.objects.create(
+                name=f'Title {i} " \\',
+                year=2000 + i,
+                category=category if i % 2 else None,
+                description=None if i == 3 else 'описание',
+            )
+            for genre in genres[:i % 4]:
+                TitleGenre.objects.create(title=title, genre=genre)
+        Title.objects.filter(name__startswith='Title 1').update(
+            rating=7.333333333333333
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_both(self, url):
+        contents = []
+        for fast in (False, True):
+            cache.clear()
+            with override_settings(API_FAST_LISTS=fast):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            contents.append(response.content)
+        return contents
+
+    def test_output_is_byte_identical(self):
+        for url in (
+            '/api/v1/titles/',
+            '/api/v1/titles/?page=2',
+            '/api/v1/titles/?category=movie&fields=id,genre,rating',
+            '/api/v1/titles/?expand=genre&fields=category,genre',
+            '/api/v1/categories/',
+            '/api/v1/genres/?search=Жанр',
+        ):
+            with self.subTest(url=url):
+                standard, fast = self.get_both(url)
+                self.assertEqual(standard, fast)
+
+    def test_fast_list_query_count(self):
+        cache.clear()
+        load_catalogs()
+        # count, страница произведений, жанры страницы.
+        with self.assertNumQueries(3):
+            self.client.get('/api/v1/titles/')
+        cache.clear()
+        load_catalogs()
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/titles/?fields=id,name')
+
+    def test_benchmark_command_checks_identity(self):
+        output = StringIO()
+        call_command('benchserializers', rows=5, iterations=1, stdout=output)
+        self.assertIn('titles', output.getvalue())
+
+
+class FastJSONRendererTest(TestCase):
+
+    def test_matches_json_renderer(self):
+        values = [
+            {'text': 'строка \u2028\u2029 "\\\n\x1f', 'n': [1, -2]},
+            {'big': 10 ** 20},
+            {'floats': [0.1, 7.964, 1e16, 1e-05, 0.0001, -0.0, 1 / 3]},
+            {'date': datetime.datetime(2020, 1, 1, 12, 0, 0, 123456)},
+            {1: 'int key'},
+            [],
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(
+                    FastJSONRenderer().render(value),
+                    JSONRenderer().render(value),
+                )
+
+    def test_indent_uses_standard_path(self):
+        self.assertEqual(
+            FastJSONRenderer().render(
+                {'a': 1}, 'application/json; indent=2'
+            ),
+            b'{\n  "a": 1\n}',
+        )
@@ -0,0 +1,17 @@
+from django.test import TestCase
+
+
+class HealthTest(TestCase):
+
+    def test_health(self):
+        response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_ready_checks_database_and_cache(self):
+        response = self.client.get('/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['checks'],
+            {'db:default': 'ok', 'cache:default': 'ok'}
+        )
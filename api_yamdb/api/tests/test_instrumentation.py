@@ -0,0 +1,55 @@
+from api.catalog import load_catalogs
+from api.instrumentation import registry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Title
+
+User = get_user_model()
+
+
+class RequestMetricsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='admin@mail.ru', role='admin'
+        )
+        Title.objects.create(name='Title', year=2000)
+
+    def setUp(self):
+        cache.clear()
+        load_catalogs()
+        registry.reset()
+        self.client = APIClient()
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_request_gets_server_timing(self):
+        response = self.client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+        metrics = registry.snapshot()['title-list']
+        self.assertEqual(metrics['queries']['count'], 1)
+        self.assertEqual(metrics['queries']['sum'], 3)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_recorded(self):
+        response = self.client.get('/api/v1/titles/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(registry.snapshot(), {})
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0)
+    def test_admin_can_dump_and_reset_metrics(self):
+        self.client.get('/api/v1/genres/')
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/v1/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('genre-list', response.data['views'])
+        self.assertIn('connects_per_s', response.data['connections'])
+        self.client.delete('/api/v1/metrics/')
+        self.assertNotIn('genre-list', registry.snapshot())
@@ -0,0 +1,35 @@
+from io import StringIO
+from unittest import mock
+
+import requests
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.loadtest import Command
+
+
+class LoadTestCommandTest(SimpleTestCase):
+
+    def run_command(self):
+        stdout = StringIO()
+        call_command(
+            'loadtest', 'http://testserver', duration=0.05, concurrency=2,
+            path=['/api/v1/genres/'], stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_request_errors_are_counted(self):
+        with mock.patch.object(
+            requests.Session, 'get',
+            side_effect=requests.ConnectionError('refused'),
+        ):
+            output = self.run_command()
+        self.assertIn('ошибок:', output)
+        self.assertNotIn('ошибок: 0,', output)
+
+    def test_crashed_client_fails_command(self):
+        with mock.patch.object(
+            Command, 'run_client', side_effect=ValueError('boom')
+        ):
+            with self.assertRaisesMessage(CommandError, '2 из 2'):
+                self.run_command()
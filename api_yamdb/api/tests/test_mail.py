@@ -0,0 +1,71 @@
+from unittest import mock
+
+from api.mail import MailQueue, mail_queue
+from api.models import QueuedMail
+from django.core import mail
+from django.test import TestCase, override_settings
+
+QUEUE_OPTIONS = {
+    'ASYNC': True,
+    'WORKERS': 1,
+    'MAX_SIZE': 10,
+    'BATCH_SIZE': 5,
+    'MAX_RETRIES': 2,
+    'RETRY_BACKOFF': 0,
+}
+
+
+@override_settings(EMAIL_QUEUE=QUEUE_OPTIONS)
+class MailQueueTest(TestCase):
+
+    def test_signup_sends_code_through_queue(self):
+        response = self.client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'reader', 'email': 'reader@example.com'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(mail_queue.flush(timeout=5))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
+
+    def test_failed_batch_is_retried(self):
+        queue = MailQueue()
+        send_messages = mock.Mock(side_effect=[OSError, 1])
+        with mock.patch('api.mail.get_connection') as get_connection:
+            get_connection.return_value.send_messages = send_messages
+            queue.send_mail('subject', 'text', 'from@example.com', ['a@b.c'])
+            self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(send_messages.call_count, 2)
+
+    @override_settings(EMAIL_QUEUE=dict(QUEUE_OPTIONS, ASYNC=False))
+    def test_sync_mode_sends_immediately(self):
+        MailQueue().send_mail('subject', 'text', 'from@example.com', ['a@b.c'])
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_QUEUE=dict(QUEUE_OPTIONS, WORKERS=0, MAX_SIZE=1))
+    def test_full_queue_spills_to_database(self):
+        queue = MailQueue()
+        with mock.patch('api.mail.get_connection') as get_connection:
+            for recipient in ('a@b.c', 'd@e.f'):
+                queue.send_mail('subject', 'text', 'from@b.c', [recipient])
+            get_connection.assert_not_called()
+        self.assertEqual(
+            list(QueuedMail.objects.values_list('recipients', flat=True)),
+            ['d@e.f'],
+        )
+        self.assertEqual(queue.drain_spilled(), 1)
+        self.assertEqual(queue.drain_spilled(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['d@e.f'])
+
+    @override_settings(EMAIL_QUEUE=dict(QUEUE_OPTIONS, WORKERS=0, MAX_SIZE=1))
+    def test_failed_spilled_batch_stays_in_database(self):
+        queue = MailQueue()
+        for recipient in ('a@b.c', 'd@e.f'):
+            queue.send_mail('subject', 'text', 'from@b.c', [recipient])
+        with mock.patch.object(queue, 'send_batch', side_effect=OSError):
+            with self.assertRaises(OSError):
+                queue.drain_spilled()
+        self.assertEqual(QueuedMail.objects.count(), 1)
+        self.assertEqual(queue.drain_spilled(), 1)
+        self.assertFalse(QueuedMail.objects.exists())
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title
+
+User = get_user_model()
+
+
+class NestedRoutesQueryCountTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Title', year=2000)
+        cls.other_title = Title.objects.create(name='Other', year=2001)
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+        cls.review = None
+        for number in range(5):
+            author = User.objects.create(
+                username=f'author{number}', email=f'a{number}@mail.ru'
+            )
+            review = Review.objects.create(
+                title=cls.title, author=author, text='text', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='c')
+            Comment.objects.create(review=review, author=cls.user, text='c')
+            cls.review = cls.review or review
+        cls.reviews_url = f'/api/v1/titles/{cls.title.id}/reviews/'
+        cls.comments_url = f'{cls.reviews_url}{cls.review.id}/comments/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_review_list(self):
+        # Родитель, count и страница отзывов вместе с авторами.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.reviews_url)
+        self.assertEqual(response.data['count'], 5)
+
+    def test_review_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.reviews_url}{self.review.id}/')
+        self.assertEqual(response.data['author'], 'author0')
+
+    def test_review_of_other_title_is_not_found(self):
+        response = self.client.get(
+            f'/api/v1/titles/{self.other_title.id}/reviews/{self.review.id}/'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_title_is_not_found(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/titles/0/reviews/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_list(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(self.comments_url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_comment_detail(self):
+        comment = self.review.comments.first()
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.comments_url}{comment.id}/')
+        self.assertEqual(response.data['id'], comment.id)
+
+    def test_comment_of_other_title_is_not_found(self):
+        response = self.client.get(
+            f'/api/v1/titles/{self.other_title.id}/reviews/'
+            f'{self.review.id}/comments/'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_review_resolves_title_once(self):
+        self.client.force_authenticate(self.user)
+        # Проверка уникальности, родитель, вставка, пересчет рейтинга и
+        # статистики.
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                self.reviews_url, {'text': 'text', 'score': 10}
+            )
+        self.assertEqual(response.status_code, 201)
+        self.title.refresh_from_db()
+        self.assertEqual(self.title.rating, 35 / 6)
+
+    def test_duplicate_review_is_rejected(self):
+        self.client.force_authenticate(self.user)
+        self.client.post(self.reviews_url, {'text': 'text', 'score': 10})
+        response = self.client.post(
+            self.reviews_url, {'text': 'text', 'score': 1}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data)
+        self.assertEqual(
+            Review.objects.filter(author=self.user).count(), 1
+        )
+
+    def test_create_comment_resolves_review_once(self):
+        self.client.force_authenticate(self.user)
+        # Родитель, вставка и счетчик комментариев в статистике.
+        with self.assertNumQueries(3):
+            response = self.client.post(self.comments_url, {'text': 'text'})
+        self.assertEqual(response.status_code, 201)
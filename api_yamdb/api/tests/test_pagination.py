@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+
+from ..pagination import KeysetPagination
+
+User = get_user_model()
+
+
+class ReviewKeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Title', year=2000)
+        pub_date = timezone.now()
+        for i in range(12):
+            author = User.objects.create(
+                username=f'user{i}', email=f'{i}@mail.ru'
+            )
+            # Пары отзывов с одинаковой датой проверяют разбор по id.
+            Review.objects.create(
+                title=cls.title,
+                author=author,
+                text=f'review {i}',
+                score=5,
+                pub_date=pub_date + timedelta(minutes=i // 2),
+            )
+        cls.url = f'/api/v1/titles/{cls.title.id}/reviews/'
+        cls.expected = list(
+            Review.objects.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_cursor_walks_forward_and_back(self):
+        response = self.client.get(self.url, {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        pages = []
+        while True:
+            pages.append([review['id'] for review in response.data['results']])
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(
+            [review['id'] for review in response.data['results']], pages[1]
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_position_filter_bounds_index_range(self):
+        # Без отдельной границы pub_date условие OR не задает начало
+        # диапазона в индексе (title, pub_date, id).
+        review = Review.objects.order_by('pub_date', 'id')[3]
+        paginator = KeysetPagination()
+        for reverse, bound in ((False, '>='), (True, '<=')):
+            queryset = paginator.filter_position(
+                Review.objects.filter(title=self.title),
+                review.pub_date, review.pk, reverse,
+            )
+            self.assertIn(f'"pub_date" {bound}', str(queryset.query))
+        self.assertEqual(
+            list(paginator.filter_position(
+                Review.objects.order_by('pub_date', 'id'),
+                review.pub_date, review.pk,
+            ).values_list('id', flat=True)),
+            self.expected[4:],
+        )
@@ -0,0 +1,165 @@
+import threading
+from unittest import mock
+
+import psycopg2
+from django.test import SimpleTestCase
+from psycopg2 import pool
+
+from ..pooled_postgresql.base import CountingConnectionPool, DatabaseWrapper
+
+SETTINGS = {
+    'ENGINE': 'api.pooled_postgresql',
+    'NAME': 'postgres',
+    'USER': '',
+    'PASSWORD': '',
+    'HOST': '',
+    'PORT': '',
+    'OPTIONS': {},
+    'CONN_MAX_AGE': 0,
+    'CONN_HEALTH_CHECKS': True,
+    'AUTOCOMMIT': True,
+    'ATOMIC_REQUESTS': False,
+    'TIME_ZONE': None,
+}
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.connection.queries += 1
+        if self.connection.broken:
+            raise psycopg2.OperationalError('server closed the connection')
+        if not self.connection.autocommit:
+            self.connection.in_transaction = True
+
+
+class FakeConnection:
+    """
+    Только что открытое соединение psycopg2: autocommit выключен, первый
+    запрос начинает транзакцию, внутри которой set_session запрещен.
+    """
+    closed = 0
+    isolation_level = None
+
+    def __init__(self, timezone, broken=False):
+        self.timezone = timezone
+        self.broken = broken
+        self.in_transaction = False
+        self._autocommit = False
+        self.queries = 0
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self.check_not_in_transaction()
+        self._autocommit = value
+
+    def check_not_in_transaction(self):
+        if self.in_transaction:
+            raise psycopg2.ProgrammingError(
+                'set_session cannot be used inside a transaction'
+            )
+
+    def set_session(self, isolation_level=None):
+        self.check_not_in_transaction()
+        self.isolation_level = isolation_level
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def commit(self):
+        self.in_transaction = False
+
+    def set_client_encoding(self, encoding):
+        pass
+
+    def get_parameter_status(self, name):
+        return self.timezone
+
+
+class PooledConnectionTest(SimpleTestCase):
+
+    def connect(self, *connections, settings=None, **options):
+        wrapper = DatabaseWrapper(
+            dict(SETTINGS, **(settings or {}), OPTIONS=options),
+            alias='pooled',
+        )
+        connection_pool = mock.Mock()
+        connection_pool.getconn.side_effect = list(connections)
+        with mock.patch.object(
+            DatabaseWrapper, 'get_pool', return_value=connection_pool
+        ):
+            wrapper.connect()
+        return wrapper, connection_pool
+
+    def test_new_connection_passes_check_and_connects(self):
+        connection = FakeConnection(timezone='UTC')
+        wrapper, connection_pool = self.connect(connection)
+        self.assertIs(wrapper.connection, connection)
+        self.assertTrue(connection.autocommit)
+        self.assertFalse(connection.in_transaction)
+        connection_pool.putconn.assert_not_called()
+
+    def test_isolation_level_is_set_after_check(self):
+        connection = FakeConnection(timezone='UTC')
+        self.connect(
+            connection,
+            isolation_level=psycopg2.extensions.ISOLATION_LEVEL_SERIALIZABLE,
+        )
+        self.assertEqual(
+            connection.isolation_level,
+            psycopg2.extensions.ISOLATION_LEVEL_SERIALIZABLE,
+        )
+        self.assertTrue(connection.autocommit)
+
+    def test_broken_connection_is_replaced(self):
+        broken = FakeConnection(timezone='UTC', broken=True)
+        connection = FakeConnection(timezone='UTC')
+        wrapper, connection_pool = self.connect(broken, connection)
+        self.assertIs(wrapper.connection, connection)
+        connection_pool.putconn.assert_called_once_with(broken, close=True)
+
+    def test_recently_checked_connection_is_not_probed_again(self):
+        connection = FakeConnection(timezone='UTC')
+        settings = {'CONN_HEALTH_CHECK_INTERVAL': 60}
+        self.connect(connection, settings=settings)
+        self.connect(connection, settings=settings)
+        self.assertEqual(connection.queries, 1)
+
+
+class CountingConnectionPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            pool.psycopg2, 'connect',
+            side_effect=lambda *args, **kwargs: mock.Mock(closed=0),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exhausted_pool_raises_after_timeout(self):
+        connection_pool = CountingConnectionPool(1, 1, timeout=0.01)
+        connection_pool.getconn()
+        with self.assertRaises(pool.PoolError):
+            connection_pool.getconn()
+
+    def test_exhausted_pool_waits_for_returned_connection(self):
+        connection_pool = CountingConnectionPool(1, 1, timeout=5)
+        connection = connection_pool.getconn()
+        threading.Timer(0.05, connection_pool.putconn, [connection]).start()
+        self.assertIs(connection_pool.getconn(), connection)
@@ -0,0 +1,174 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+
+User = get_user_model()
+
+TITLES = 3000
+CATEGORIES = 50
+GENRES = 40
+REVIEWED_TITLES = 200
+AUTHORS = 20
+
+
+class QueryPlanTest(TestCase):
+    """
+    Основной запрос каждого горячего эндпоинта должен читать таблицы
+    через индекс, а не полным просмотром.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(CATEGORIES)
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'Genre {i}', slug=f'genre-{i}') for i in range(GENRES)
+        )
+        # SQLite не возвращает id из bulk_create.
+        categories = list(Category.objects.order_by('pk'))
+        genres = list(Genre.objects.order_by('pk'))
+        Title.objects.bulk_create(
+            Title(
+                name=f'Title {i}',
+                year=1900 + i % 120,
+                category=categories[i % CATEGORIES],
+            )
+            for i in range(TITLES)
+        )
+        titles = list(Title.objects.order_by('pk'))
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genres[(i + shift) % GENRES])
+            for i, title in enumerate(titles)
+            for shift in (0, 7)
+        )
+        User.objects.bulk_create(
+            User(username=f'user{i}', email=f'user{i}@mail.ru')
+            for i in range(AUTHORS)
+        )
+        authors = list(User.objects.order_by('pk'))
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='text', score=5)
+            for title in titles[:REVIEWED_TITLES]
+            for author in authors
+        )
+        cls.review = Review.objects.order_by('pk').first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=authors[0], text='text')
+            for review in Review.objects.filter(title=cls.review.title_id)
+        )
+        cls.title = titles[0]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get_main_query(self, url, table):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if re.search(rf'\bFROM "?{table}"?\s', query['sql'])
+            and 'COUNT(' not in query['sql']
+        ]
+        self.assertTrue(queries, f'{url}: нет запроса к {table}')
+        return queries[0]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # На небольших таблицах планировщик может предпочесть
+                # seq scan, здесь важно, что индекс вообще применим.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assert_uses_index(self, url, table, sorted_by_index=False):
+        plan = self.explain(self.get_main_query(url, table))
+        if connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan', plan)
+            if sorted_by_index:
+                self.assertNotRegex(plan, r'\bSort\b')
+            return
+        for line in plan.splitlines():
+            if re.search(r'\bSCAN\b', line):
+                self.assertRegex(line, r'USING|VIRTUAL TABLE INDEX', plan)
+        if sorted_by_index:
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_review_list(self):
+        self.assert_uses_index(
+            f'/api/v1/titles/{self.title.id}/reviews/',
+            'reviews_review',
+            sorted_by_index=True,
+        )
+
+    def test_review_list_cursor(self):
+        self.assert_uses_index(
+            f'/api/v1/titles/{self.title.id}/reviews/?pagination=cursor',
+            'reviews_review',
+            sorted_by_index=True,
+        )
+
+    def test_review_list_cursor_next_page(self):
+        # Страница по курсору - поиск диапазона индекса от ключа, а не
+        # просмотр отзывов произведения с начала.
+        url = f'/api/v1/titles/{self.title.id}/reviews/?pagination=cursor'
+        url = self.client.get(url).data['next']
+        plan = self.explain(self.get_main_query(url, 'reviews_review'))
+        if connection.vendor == 'postgresql':
+            self.assertRegex(plan, r'Index Cond: .*pub_date')
+        else:
+            self.assertRegex(
+                plan, r'USING INDEX .*\(title_id=\? AND pub_date>'
+            )
+
+    def test_comment_list(self):
+        self.assert_uses_index(
+            f'/api/v1/titles/{self.title.id}/reviews/'
+            f'{self.review.id}/comments/',
+            'reviews_comment',
+            sorted_by_index=True,
+        )
+
+    def test_title_list(self):
+        self.assert_uses_index('/api/v1/titles/', 'reviews_title')
+
+    def test_title_list_by_year(self):
+        self.assert_uses_index(
+            '/api/v1/titles/?year=1950', 'reviews_title',
+            sorted_by_index=True,
+        )
+
+    def test_title_list_by_category(self):
+        self.assert_uses_index(
+            '/api/v1/titles/?category=category-3', 'reviews_title',
+            sorted_by_index=True,
+        )
+
+    def test_title_list_by_genre(self):
+        self.assert_uses_index(
+            '/api/v1/titles/?genre=genre-5', 'reviews_title'
+        )
+
+    def test_title_search(self):
+        # На PostgreSQL - триграммные индексы, на SQLite - таблица FTS5.
+        self.assert_uses_index(
+            '/api/v1/titles/?search=Title 12', 'reviews_title'
+        )
+
+    def test_category_and_genre_lists(self):
+        self.assert_uses_index('/api/v1/categories/', 'reviews_category')
+        self.assert_uses_index('/api/v1/genres/', 'reviews_genre')
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+
+class ReviewBatchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='user', email='u@mail.ru')
+        cls.first = Title.objects.create(name='First', year=2000)
+        cls.second = Title.objects.create(name='Second', year=2001)
+        cls.reviewed = Title.objects.create(name='Reviewed', year=2002)
+        Review.objects.create(
+            title=cls.reviewed, author=cls.user, text='old', score=3
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_batch_creates_reviews_with_per_item_results(self):
+        payload = [
+            {'title': self.first.id, 'text': 'a', 'score': 10},
+            {'title': self.second.id, 'text': 'b', 'score': 6},
+            {'title': self.first.id, 'text': 'again', 'score': 1},
+            {'title': self.reviewed.id, 'text': 'c', 'score': 5},
+            {'title': 9999, 'text': 'd', 'score': 5},
+            {'title': self.second.id, 'text': 'e', 'score': 11},
+        ]
+        # Две проверки, bulk_create в точке сохранения, обновление рейтинга
+        # и статистики по каждому затронутому произведению и, если бэкенд
+        # не возвращает id из bulk_create, выборка id созданных отзывов.
+        queries = 9
+        if not connection.features.can_return_ids_from_bulk_insert:
+            queries += 1
+        with self.assertNumQueries(queries):
+            response = self.client.post(
+                '/api/v1/reviews/batch/', payload, format='json'
+            )
+        self.assertEqual(response.status_code, 207)
+        statuses = [item['status'] for item in response.data]
+        self.assertEqual(statuses, [201, 201, 400, 400, 404, 400])
+        created = response.data[0]['review']
+        self.assertEqual(created['author'], 'user')
+        self.assertEqual(
+            Review.objects.get(pk=created['id']).title_id, self.first.id
+        )
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual(self.first.rating, 10.0)
+        self.assertEqual(self.second.rating, 6.0)
+
+    def test_duplicate_in_same_batch_is_rejected(self):
+        response = self.client.post('/api/v1/reviews/batch/', [
+            {'title': self.first.id, 'text': 'a', 'score': 10},
+            {'title': self.first.id, 'text': 'b', 'score': 1},
+        ], format='json')
+        self.assertEqual(
+            [item['status'] for item in response.data], [201, 400]
+        )
+        self.assertEqual(
+            Review.objects.filter(title=self.first, author=self.user).count(),
+            1,
+        )
+
+    def test_database_rejects_second_review_of_author(self):
+        # Последний рубеж для гонки параллельных запросов: проверку в
+        # Python обе стороны могут пройти одновременно.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Review.objects.create(
+                title=self.reviewed, author=self.user, text='new', score=1
+            )
+
+    def test_requires_list_and_authentication(self):
+        response = self.client.post(
+            '/api/v1/reviews/batch/', {'title': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(None)
+        response = self.client.post(
+            '/api/v1/reviews/batch/', [], format='json'
+        )
+        self.assertEqual(response.status_code, 401)
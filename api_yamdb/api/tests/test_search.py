@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Title
+
+
+class TitleSearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Тюремная драма о надежде'
+        )
+        Title.objects.create(
+            name='Зеленая миля', year=1999,
+            description='Побег от реальности в тюремном блоке'
+        )
+        Title.objects.create(name='Крестный отец', year=1972)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def search(self, query):
+        response = self.client.get('/api/v1/titles/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [title['name'] for title in response.data['results']]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(
+            self.search('побег'), ['Побег из Шоушенка', 'Зеленая миля']
+        )
+
+    def test_substring_search(self):
+        self.assertCountEqual(self.search('юрем'), [
+            'Зеленая миля', 'Побег из Шоушенка'
+        ])
+        self.assertEqual(self.search('стный'), ['Крестный отец'])
+
+    def test_short_query_and_no_match(self):
+        self.assertEqual(self.search('от'), [
+            'Зеленая миля', 'Крестный отец'
+        ])
+        self.assertEqual(self.search('вестерн'), [])
+
+    def test_search_index_follows_updates(self):
+        title = Title.objects.get(name='Крестный отец')
+        title.name = 'Однажды на Диком Западе'
+        title.save()
+        self.assertEqual(self.search('диком'), ['Однажды на Диком Западе'])
+        self.assertEqual(self.search('крестный'), [])
+
+    def test_postgresql_filter_matches_trigram_index(self):
+        # Индексы построены по самим колонкам, без UPPER().
+        sql = str(Title.objects.filter(name__ilike_contains='50%').query)
+        self.assertIn(r'"reviews_title"."name" ILIKE %50\%%', sql)
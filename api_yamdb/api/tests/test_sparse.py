@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+
+User = get_user_model()
+
+
+class SparseFieldsetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Книги', slug='books')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        cls.title = Title.objects.create(
+            name='Title', year=2000, category=category, description='long'
+        )
+        TitleGenre.objects.create(title=cls.title, genre=genre)
+        cls.author = User.objects.create(
+            username='author', email='a@mail.ru', first_name='Имя'
+        )
+        cls.review = Review.objects.create(
+            title=cls.title, author=cls.author, text='text', score=7
+        )
+        Comment.objects.create(review=cls.review, author=cls.author, text='c')
+        cls.reviews_url = f'/api/v1/titles/{cls.title.id}/reviews/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get_with_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_default_output_is_unchanged(self):
+        response = self.client.get(f'/api/v1/titles/{self.title.id}/')
+        self.assertEqual(
+            list(response.data),
+            ['id', 'category', 'genre', 'rating', 'name', 'year',
+             'description']
+        )
+        self.assertEqual(response.data['category']['slug'], 'books')
+        self.assertEqual(response.data['genre'][0]['name'], 'Драма')
+
+    def test_fields_shrink_payload_and_sql(self):
+        # count и страница без join категории и без выборки жанров.
+        with self.assertNumQueries(2):
+            response, queries = self.get_with_queries(
+                '/api/v1/titles/?fields=id,name,rating'
+            )
+        self.assertEqual(
+            response.data['results'], [
+                {'id': self.title.id, 'rating': 7.0, 'name': 'Title'}
+            ]
+        )
+        self.assertNotIn('description', queries[1])
+        self.assertNotIn('JOIN', queries[1])
+
+    def test_collapsed_relations_are_slugs(self):
+        response = self.client.get(
+            f'/api/v1/titles/{self.title.id}/?expand=genre'
+            f'&fields=category,genre'
+        )
+        self.assertEqual(response.data, {
+            'category': 'books',
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+        })
+
+    def test_expand_author(self):
+        response, queries = self.get_with_queries(
+            f'{self.reviews_url}?fields=id,author&expand=author'
+        )
+        self.assertEqual(response.data['results'][0]['author'], {
+            'username': 'author', 'first_name': 'Имя', 'last_name': '',
+            'bio': '',
+        })
+        self.assertNotIn('"password"', queries[-1])
+        response = self.client.get(
+            f'{self.reviews_url}{self.review.id}/comments/?fields=author'
+        )
+        self.assertEqual(response.data['results'], [{'author': 'author'}])
+
+    def test_unknown_names_are_rejected(self):
+        for query in ('fields=id,secret', 'expand=text'):
+            response = self.client.get(f'{self.reviews_url}?{query}')
+            self.assertEqual(response.status_code, 400)
+
+    def test_keyset_pagination_with_sparse_fields(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                f'{self.reviews_url}?pagination=cursor&fields=id'
+            )
+        self.assertEqual(response.data['results'], [{'id': self.review.id}])
@@ -0,0 +1,99 @@
+import threading
+import time
+from unittest import mock
+
+from api.cache import get_cache
+from api.throttling import AuthUsernameThrottle, TokenBucketThrottle
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+RATES = {'auth_ip': '3/min', 'auth_username': '2/min'}
+
+
+@mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', RATES)
+class AuthThrottleTest(TestCase):
+    url = '/api/v1/auth/token/'
+
+    def setUp(self):
+        get_cache().clear()
+
+    def post(self, username, **extra):
+        return self.client.post(
+            self.url,
+            {'username': username, 'confirmation_code': 'wrong'},
+            **extra
+        )
+
+    def test_username_bucket_rejects_before_database(self):
+        for _ in range(2):
+            self.assertEqual(self.post('reader').status_code, 404)
+        with self.assertNumQueries(0):
+            response = self.post('Reader', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_ip_bucket_is_shared_between_usernames(self):
+        for username in ('first', 'second', 'third'):
+            self.assertEqual(self.post(username).status_code, 404)
+        self.assertEqual(self.post('fourth').status_code, 429)
+        self.assertEqual(
+            self.post('fourth', REMOTE_ADDR='10.0.0.2').status_code, 404
+        )
+
+    def test_spoofed_forwarded_for_shares_bucket(self):
+        # nginx дописывает настоящий адрес последним, подставленные
+        # клиентом адреса перед ним не создают новых корзин.
+        for i in range(3):
+            response = self.post(
+                f'user{i}', HTTP_X_FORWARDED_FOR=f'1.2.3.{i}, 10.0.0.5'
+            )
+            self.assertEqual(response.status_code, 404)
+        response = self.post(
+            'user3', HTTP_X_FORWARDED_FOR='1.2.3.3, 10.0.0.5'
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_non_object_body_is_rejected_by_serializer(self):
+        for url in (self.url, '/api/v1/auth/signup/'):
+            response = self.client.post(
+                url, ['reader'], content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_bucket_refills_over_time(self):
+        with mock.patch.object(TokenBucketThrottle, 'timer') as timer:
+            timer.return_value = 1000.0
+            for _ in range(2):
+                self.post('reader')
+            self.assertEqual(self.post('reader').status_code, 429)
+            timer.return_value = 1030.0
+            self.assertEqual(self.post('reader').status_code, 404)
+            self.assertEqual(self.post('reader').status_code, 429)
+
+    def test_concurrent_requests_share_tokens(self):
+        original_get = LocMemCache.get
+
+        def slow_get(cache, *args, **kwargs):
+            # Все потоки успевают прочитать корзину до чужой записи.
+            try:
+                return original_get(cache, *args, **kwargs)
+            finally:
+                time.sleep(0.005)
+
+        request = mock.Mock(data={'username': 'reader'})
+        barrier = threading.Barrier(8)
+        allowed = []
+
+        def call():
+            barrier.wait()
+            allowed.append(
+                AuthUsernameThrottle().allow_request(request, None)
+            )
+
+        with mock.patch.object(LocMemCache, 'get', slow_get):
+            threads = [threading.Thread(target=call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 2)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from api.catalog import load_catalogs
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, TitleGenre
+from reviews.rankings import refresh_rankings
+
+User = get_user_model()
+
+
+class TitleListQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'cat-{i}')
+            for i in range(3)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Genre {i}', slug=f'genre-{i}')
+            for i in range(3)
+        ]
+        authors = [
+            User.objects.create(username=f'user{i}', email=f'{i}@mail.ru')
+            for i in range(3)
+        ]
+        for i in range(12):
+            title = Title.objects.create(
+                name=f'Title {i:02}',
+                year=2000 + i,
+                category=categories[i % 3],
+            )
+            for genre in genres[:i % 3 + 1]:
+                TitleGenre.objects.create(title=title, genre=genre)
+            for score, author in enumerate(authors, start=i % 5 + 1):
+                Review.objects.create(
+                    title=title, author=author, text='text', score=score
+                )
+
+    def setUp(self):
+        cache.clear()
+        # Категории и жанры отдаются из каталога в памяти процесса.
+        load_catalogs()
+        self.client = APIClient()
+
+    def test_title_page_query_count(self):
+        # COUNT для пагинации, страница произведений, жанры страницы.
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/titles/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 12)
+        first = response.data['results'][0]
+        self.assertEqual(first['name'], 'Title 00')
+        self.assertEqual(first['category']['slug'], 'cat-0')
+        self.assertEqual([g['slug'] for g in first['genre']], ['genre-0'])
+        self.assertEqual(first['rating'], 2.0)
+
+    def test_filtered_title_page_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                '/api/v1/titles/', {'genre': 'genre-0', 'category': 'cat-2'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        names = [title['name'] for title in response.data['results']]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_title_detail_query_count(self):
+        title = Title.objects.get(name='Title 05')
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/titles/{title.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['genre']), 3)
+        self.assertEqual(response.data['rating'], 2.0)
+
+    def test_stats_is_single_lookup(self):
+        title = Title.objects.get(name='Title 00')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/titles/{title.id}/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['review_count'], 3)
+        self.assertEqual(response.data['rating'], 2.0)
+        self.assertEqual(
+            [response.data['scores'][score] for score in ('1', '2', '3')],
+            [1, 1, 1]
+        )
+        self.assertEqual(
+            self.client.get('/api/v1/titles/0/stats/').status_code, 404
+        )
+
+    def test_top_leaderboard(self):
+        refresh_rankings()
+        # Страница произведений вместе с рейтингами и жанры страницы.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/titles/top/?limit=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+        scores = [title['bayesian_score'] for title in response.data]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(response.data[0]['rating'], 6.0)
+        response = self.client.get('/api/v1/titles/top/?category=cat-1')
+        self.assertEqual(
+            {title['category']['slug'] for title in response.data}, {'cat-1'}
+        )
+        self.assertEqual(
+            self.client.get('/api/v1/titles/top/?limit=x').status_code, 400
+        )
+
+    def test_trending_leaderboard(self):
+        title = Title.objects.get(name='Title 00')
+        Review.objects.filter(title=title).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        refresh_rankings(full=True)
+        response = self.client.get('/api/v1/titles/trending/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 10)
+        self.assertNotIn(title.id, [item['id'] for item in response.data])
+        scores = [item['trending_score'] for item in response.data]
+        self.assertEqual(scores, sorted(scores, reverse=True))
@@ -0,0 +1,84 @@
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from .cache import get_cache
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Корзина токенов в общем кеше: емкость и скорость пополнения берутся
+    из DEFAULT_THROTTLE_RATES (например, 5/min - до 5 запросов подряд и
+    один новый запрос раз в 12 секунд).
+
+    В отличие от SimpleRateThrottle хранит не историю запросов, а пару
+    (остаток токенов, время обновления). Чтение и запись корзины идут под
+    блокировкой в том же кеше (cache.add), поэтому одновременные запросы
+    из разных воркеров не тратят один и тот же токен. Отклоненный запрос
+    кеш не меняет.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+    lock_timeout = 1
+    lock_attempts = 50
+    lock_delay = 0.002
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        cache = get_cache()
+        lock_key = f'{self.key}:lock'
+        for _ in range(self.lock_attempts):
+            if cache.add(lock_key, 1, self.lock_timeout):
+                break
+            time.sleep(self.lock_delay)
+        else:
+            # Корзину долго держат другие запросы с тем же ключом - это
+            # тот самый всплеск, который нужно ограничить.
+            self.tokens = 0
+            return False
+        try:
+            return self.take_token(cache)
+        finally:
+            cache.delete(lock_key)
+
+    def take_token(self, cache):
+        now = self.timer()
+        tokens, updated = cache.get(self.key, (self.num_requests, now))
+        refill = max(now - updated, 0) * self.num_requests / self.duration
+        self.tokens = min(self.num_requests, tokens + refill)
+        if self.tokens < 1:
+            return False
+        cache.set(self.key, (self.tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        # Тело может быть списком или строкой, его отклонит сериализатор,
+        # а ограничение останется только по IP.
+        data = request.data if isinstance(request.data, dict) else {}
+        username = data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': username.lower(),
+        }
@@ -28,5 +28,16 @@ urlpatterns = [
     ),
     path('v1/auth/token/', views.GetJwtTokenView.as_view(), name='get_token'),
     path('v1/users/me/', views.CurrentUserView.as_view(), name='CurrentUser'),
+    path(
+        'v1/reviews/batch/',
+        views.ReviewBatchView.as_view(),
+        name='reviews_batch'
+    ),
+    path('v1/metrics/', views.MetricsView.as_view(), name='metrics'),
+    path(
+        'v1/export/<str:name>/',
+        views.ExportView.as_view(),
+        name='export'
+    ),
     path('v1/', include(router.urls))
 ]
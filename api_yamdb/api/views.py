@@ -1,21 +1,40 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.http import Http404
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.timezone import now
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import (filters, mixins, pagination, permissions, status,
-                            viewsets)
+from rest_framework import (filters, generics, mixins, pagination, permissions,
+                            status, viewsets)
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.exporters import EXPORTS, FORMATS, export
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, TitleStats)
+from reviews.rankings import trending_window
+from reviews.ratings import apply_bulk_reviews
 
 from . import serializers
+from .authentication import get_token_for_user
+from .cache import (CachedListMixin, CachedRetrieveMixin, ConditionalGetMixin,
+                    bump_generation)
+from .catalog import CatalogListMixin, category_catalog, genre_catalog
+from .fastpath import ValuesListMixin
 from .filters import TitleFilter
+from .instrumentation import InstrumentedViewMixin, connection_stats, registry
+from .mail import mail_queue
+from .nested import NestedViewMixin
+from .pagination import PageNumberOrKeysetPagination
 from .permissions import (IsAdminUser, IsAdminUserOrReadOnly,
                           IsAuthorOrReadOnly, IsModeratorOrReadOnly,
                           IsUserOrReadOnly)
+from .sparse import SparseFieldsetViewMixin
+from .throttling import AuthIPThrottle, AuthUsernameThrottle
 
 
 class MixinSet(
@@ -27,81 +46,272 @@ class MixinSet(
     pass
 
 
-class CategoryViewSet(MixinSet):
+class CategoryViewSet(
+    InstrumentedViewMixin,
+    CachedListMixin,
+    CatalogListMixin,
+    ValuesListMixin,
+    MixinSet,
+):
     queryset = Category.objects.all()
     serializer_class = serializers.CategorySerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = (Category,)
+    catalog = category_catalog
 
 
-class GenreViewSet(MixinSet):
+class GenreViewSet(
+    InstrumentedViewMixin,
+    CachedListMixin,
+    CatalogListMixin,
+    ValuesListMixin,
+    MixinSet,
+):
     queryset = Genre.objects.all()
     serializer_class = serializers.GenreSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = (Genre,)
+    catalog = genre_catalog
 
 
 User = get_user_model()
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    InstrumentedViewMixin,
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    NestedViewMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Review.objects.select_related('author')
     serializer_class = serializers.ReviewSerializer
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly
         & (IsAdminUserOrReadOnly | IsModeratorOrReadOnly | IsAuthorOrReadOnly)
     ]
+    # Title в зависимостях: удаление произведения без отзывов тоже должно
+    # сменить ETag, иначе на старый ETag вернется 304 вместо 404.
+    cache_dependencies = (Review, Title, User)
+    # Ключ постраничного вывода по курсору.
+    sparse_required_fields = ('pub_date',)
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
+    child_lookups = {'title_id': 'title_id'}
+
+
+class ReviewBatchView(APIView):
+    """
+    Создает пачку отзывов текущего пользователя, в том числе к разным
+    произведениям. Существование произведений и уникальность отзывов
+    проверяются одним запросом на пачку, отзывы пишутся одним bulk_create.
+    """
+    permission_classes = (permissions.IsAuthenticated, )
 
-    def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        # queryset = title.reviews.all()
-        return title.reviews.all()
-
-    def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(title=title, author=self.request.user)
-
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидается список отзывов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > settings.REVIEW_BATCH_MAX_SIZE:
+            return Response(
+                {'detail': f'Не больше {settings.REVIEW_BATCH_MAX_SIZE} '
+                           f'отзывов за запрос.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = []
+        items = []
+        for index, item in enumerate(request.data):
+            serializer = serializers.ReviewBatchItemSerializer(data=item)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+                results.append(None)
+            else:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                })
+        reviews = self.create_reviews(request.user, items, results)
+        if reviews:
+            bump_generation(Review)
+            self.set_created_ids(
+                request.user, [review for _, review in reviews]
+            )
+        for index, review in reviews:
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'review': serializers.ReviewSerializer(review).data,
+            }
+        all_created = len(reviews) == len(results)
+        return Response(
+            results,
+            status=(
+                status.HTTP_201_CREATED if all_created
+                else status.HTTP_207_MULTI_STATUS
+            )
+        )
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def create_reviews(user, items, results):
+        """
+        Создает отзывы из проверенных элементов пачки и записывает в
+        results ошибки остальных. Возвращает пары (индекс, отзыв).
+        """
+        title_ids = {data['title'] for _, data in items}
+        with transaction.atomic():
+            # Блокировка произведений в порядке pk выстраивает параллельные
+            # пачки к одним произведениям в очередь: следующая увидит отзывы
+            # предыдущей. Уникальность (title, author) держит и сама БД.
+            existing = set(Title.objects.select_for_update().filter(
+                pk__in=title_ids
+            ).order_by('pk').values_list('pk', flat=True))
+            reviewed = set(Review.objects.filter(
+                author=user, title_id__in=title_ids
+            ).order_by().values_list('title_id', flat=True))
+            reviews = []
+            for index, data in items:
+                title_id = data['title']
+                if title_id not in existing:
+                    results[index] = {
+                        'status': status.HTTP_404_NOT_FOUND,
+                        'errors': {'title': ['Произведение не найдено.']},
+                    }
+                elif title_id in reviewed:
+                    results[index] = {
+                        'status': status.HTTP_400_BAD_REQUEST,
+                        'errors': {'non_field_errors': [
+                            'Ошибка: Можно оставить только один отзыв '
+                            'к произведению.'
+                        ]},
+                    }
+                else:
+                    reviewed.add(title_id)
+                    reviews.append((index, Review(
+                        title_id=title_id,
+                        author=user,
+                        text=data['text'],
+                        score=data['score'],
+                    )))
+            if reviews:
+                created = [review for _, review in reviews]
+                Review.objects.bulk_create(created)
+                apply_bulk_reviews(created)
+        return reviews
+
+    @staticmethod
+    def set_created_ids(author, reviews):
+        # bulk_create возвращает первичные ключи только на PostgreSQL.
+        if all(review.pk is not None for review in reviews):
+            return
+        ids = dict(Review.objects.filter(
+            author=author,
+            title_id__in=[review.title_id for review in reviews]
+        ).order_by().values_list('title_id', 'id'))
+        for review in reviews:
+            review.pk = ids[review.title_id]
+
+
+class CommentViewSet(
+    InstrumentedViewMixin,
+    ConditionalGetMixin,
+    SparseFieldsetViewMixin,
+    NestedViewMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Comment.objects.select_related('author')
     serializer_class = serializers.CommentSerializer
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly
         & (IsAdminUserOrReadOnly | IsModeratorOrReadOnly | IsAuthorOrReadOnly)
     ]
-
-    def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id, title__id=title_id)
-        # queryset = review.comments.all()
-        return review.comments.all()
-
-    def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id, title__id=title_id)
-        serializer.save(review=review, author=self.request.user)
-
-
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+    # Review в зависимостях по той же причине: удаление или перенос
+    # отзыва без комментариев.
+    cache_dependencies = (Comment, Review, User)
+    # Ключ постраничного вывода по курсору.
+    sparse_required_fields = ('pub_date',)
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    child_lookups = {'review_id': 'review_id', 'review__title_id': 'title_id'}
+
+
+class TitleViewSet(
+    InstrumentedViewMixin,
+    ConditionalGetMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    ValuesListMixin,
+    SparseFieldsetViewMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminUserOrReadOnly,)
     serializer_class = serializers.TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    cache_dependencies = (Title, Category, Genre, TitleGenre, Review)
+    leaderboard_size = 10
+    leaderboard_max_size = 100
 
     def get_serializer_class(self):
+        if self.action in ('top', 'trending'):
+            return serializers.TitleRankingSerializer
         if self.request.method in permissions.SAFE_METHODS:
             return serializers.TitleSerializerGet
         return serializers.TitleSerializer
 
+    @action(detail=True, methods=('get',))
+    def stats(self, request, pk=None):
+        # Одна выборка по первичному ключу, без агрегации по отзывам.
+        stats = generics.get_object_or_404(TitleStats, title_id=pk)
+        return Response(serializers.TitleStatsSerializer(stats).data)
+
+    def get_leaderboard_limit(self):
+        limit = self.request.query_params.get('limit')
+        try:
+            limit = int(limit) if limit else self.leaderboard_size
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        return min(max(limit, 1), self.leaderboard_max_size)
+
+    def leaderboard(self, queryset):
+        # Фильтры genre, category и year работают так же, как в списке.
+        titles = self.filter_queryset(queryset)[:self.get_leaderboard_limit()]
+        return Response(self.get_serializer(titles, many=True).data)
+
+    @action(detail=False, methods=('get',))
+    def top(self, request):
+        # Порядок берется из индекса TitleRanking.bayesian_score, рейтинг
+        # пересчитывается командой refreshrankings.
+        return self.leaderboard(
+            self.get_queryset().filter(ranking__isnull=False).order_by(
+                '-ranking__bayesian_score', 'pk'
+            )
+        )
+
+    @action(detail=False, methods=('get',))
+    def trending(self, request):
+        return self.leaderboard(
+            self.get_queryset().filter(
+                ranking__trending_key__isnull=False,
+                stats__last_activity__gte=now() - trending_window(),
+            ).order_by('-ranking__trending_key', 'pk')
+        )
+
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     permission_classes = (IsAdminUser, )
     queryset = User.objects.all()
     serializer_class = serializers.UserSerializer
@@ -146,6 +356,7 @@ class CurrentUserView(APIView):
 
 class GetConfirmationCodeView(APIView):
     permission_classes = (permissions.AllowAny, )
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = serializers.ConfirmationCodeSerializer(data=request.data)
@@ -161,12 +372,11 @@ class GetConfirmationCodeView(APIView):
                 username=serializer.data.get('username')
             )
             token = default_token_generator.make_token(user)
-            send_mail(
+            mail_queue.send_mail(
                 'Токен авторизации',
                 f'Вот твой токен {token}',
                 'from@example.com',
                 [serializer.data.get('email')],
-                fail_silently=False
             )
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -174,6 +384,7 @@ class GetConfirmationCodeView(APIView):
 
 class GetJwtTokenView(APIView):
     permission_classes = (permissions.AllowAny, )
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = serializers.JwtTokenSerializer(data=request.data)
@@ -184,7 +395,7 @@ class GetJwtTokenView(APIView):
             )
             confirmation_code = request.data.get('confirmation_code')
             if default_token_generator.check_token(user, confirmation_code):
-                refresh = RefreshToken.for_user(user)
+                refresh = get_token_for_user(RefreshToken, user)
                 context = {
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -195,3 +406,39 @@ class GetJwtTokenView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ExportView(APIView):
+    permission_classes = (IsAdminUser, )
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request, name):
+        output = request.query_params.get('output', 'csv')
+        if name not in EXPORTS or output not in FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export(name, output),
+            content_type=self.content_types[output]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{output}"'
+        )
+        return response
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return Response({
+            'views': registry.snapshot(),
+            'connections': connection_stats.snapshot(),
+        })
+
+    def delete(self, request):
+        registry.reset()
+        connection_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
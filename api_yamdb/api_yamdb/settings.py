@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,10 +69,36 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', '5432')
+        'PORT': os.getenv('DB_PORT', '5432'),
+        # Соединение живет между запросами CONN_MAX_AGE секунд и перед
+        # повторным использованием проверяется запросом SELECT 1, но не
+        # чаще раза в CONN_HEALTH_CHECK_INTERVAL секунд.
+        # Для ENGINE = 'api.pooled_postgresql' нужен DB_CONN_MAX_AGE=0.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', 'True'
+        ) == 'True',
+        'CONN_HEALTH_CHECK_INTERVAL': int(
+            os.getenv('DB_CONN_HEALTH_CHECK_INTERVAL', 10)
+        ),
+        'POOL_MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+        'POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', 30)),
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_RESPONSE_CACHE_TIMEOUT = int(os.getenv('API_RESPONSE_CACHE_TIMEOUT', 300))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,14 +143,53 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP', '20/min'),
+        'auth_username': os.getenv('THROTTLE_AUTH_USERNAME', '5/min'),
+    },
+    # Перед приложением стоит nginx: адрес клиента - последний в
+    # X-Forwarded-For, предыдущие клиент мог подставить сам.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 1)),
 }
 
+# Доля запросов, для которых собираются метрики и заголовок Server-Timing.
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.getenv('REQUEST_METRICS_SAMPLE_RATE', 0.1)
+)
+
+REVIEW_BATCH_MAX_SIZE = 1000
+
+# Списки произведений, категорий и жанров через .values() без моделей.
+API_FAST_LISTS = os.getenv('API_FAST_LISTS', 'True') == 'True'
+
+# Вес общего среднего в байесовском рейтинге, в числе оценок.
+RANKING_BAYESIAN_PRIOR = 10
+RANKING_TRENDING_HALF_LIFE_HOURS = 24
+RANKING_TRENDING_WINDOW_DAYS = 7
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_QUEUE = {
+    # False - отправлять письма синхронно в потоке запроса.
+    'ASYNC': os.getenv('EMAIL_QUEUE_ASYNC', 'True') == 'True',
+    'WORKERS': int(os.getenv('EMAIL_QUEUE_WORKERS', 2)),
+    'MAX_SIZE': int(os.getenv('EMAIL_QUEUE_MAX_SIZE', 1000)),
+    'BATCH_SIZE': 50,
+    'MAX_RETRIES': 3,
+    'RETRY_BACKOFF': 1.0,
+}
+
+# Пользователи, найденные по JWT, кешируются в памяти процесса.
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', 1024))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', 60))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=3),
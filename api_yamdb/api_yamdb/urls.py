@@ -1,3 +1,4 @@
+from api import health
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -11,4 +12,6 @@ urlpatterns = [
         TemplateView.as_view(template_name='redoc.html'),
         name='redoc'
     ),
+    path('health/', health.health, name='health'),
+    path('ready/', health.ready, name='ready'),
 ]
@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1
+))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync'
+)
+
+# Приложение импортируется один раз в мастер-процессе, воркеры получают
+# его через fork: быстрее старт и меньше памяти за счет copy-on-write.
+preload_app = True
+
+# Плавный перезапуск воркеров после N запросов ограничивает рост памяти,
+# разброс не дает всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# В контейнере /tmp может быть на overlayfs, heartbeat-файлы воркеров
+# держим в памяти.
+worker_tmp_dir = '/dev/shm'
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Соединения с БД, открытые в мастере при preload_app, не должны
+    # использоваться несколькими процессами.
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,108 @@
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+
+from .models import Category, Comment, Genre, Review, Title, TitleGenre
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Колонки совпадают с файлами static/data, которые загружает loadcsv:
+# (заголовок колонки, поле для values_list).
+EXPORTS = {
+    'users': (get_user_model(), (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('role', 'role'),
+        ('bio', 'bio'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'category': (Category, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+    )),
+    'genre': (Genre, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+    )),
+    'titles': (Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('description', 'description'),
+        ('category', 'category_id'),
+    )),
+    'genre_title': (TitleGenre, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('genre_id', 'genre_id'),
+    )),
+    'review': (Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comment, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('pub_date', 'pub_date'),
+    )),
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _prepare(value):
+    if hasattr(value, 'strftime'):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+def iter_rows(name, chunk_size=2000):
+    model, columns = EXPORTS[name]
+    queryset = model._default_manager.order_by('pk').values_list(
+        *(field for _, field in columns)
+    )
+    # iterator() не кеширует выборку, а на PostgreSQL читает ее
+    # серверным курсором пачками по chunk_size строк.
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [_prepare(value) for value in row]
+
+
+def export_csv(name, chunk_size=2000):
+    writer = csv.writer(Echo())
+    _, columns = EXPORTS[name]
+    yield writer.writerow([header for header, _ in columns])
+    for row in iter_rows(name, chunk_size):
+        yield writer.writerow(
+            ['' if value is None else value for value in row]
+        )
+
+
+def export_ndjson(name, chunk_size=2000):
+    _, columns = EXPORTS[name]
+    headers = [header for header, _ in columns]
+    for row in iter_rows(name, chunk_size):
+        yield json.dumps(dict(zip(headers, row)), ensure_ascii=False) + '\n'
+
+
+def export(name, output='csv', chunk_size=2000):
+    if output == 'ndjson':
+        return export_ndjson(name, chunk_size)
+    return export_csv(name, chunk_size)
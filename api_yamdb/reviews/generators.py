@@ -0,0 +1,190 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка', 'сцена',
+    'хорошо', 'скучно', 'сильно', 'неожиданно', 'очень', 'совсем', 'снова',
+    'понравился', 'разочаровал', 'советую', 'перечитаю', 'пересмотрю',
+)
+BASE_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN = int(timedelta(days=3 * 365).total_seconds())
+
+
+def zipf_cdf(rank, n, skew):
+    """
+    Доля первых rank объектов из n при распределении Ципфа. Считается по
+    непрерывному приближению, чтобы не суммировать n слагаемых.
+    """
+    if abs(skew - 1) < 1e-9:
+        return math.log(rank + 1) / math.log(n + 1)
+    power = 1 - skew
+    return ((rank + 1) ** power - 1) / ((n + 1) ** power - 1)
+
+
+def zipf_rank(rng, n, skew):
+    """Случайный номер от 0 до n - 1, малые номера выпадают чаще."""
+    u = rng.random()
+    if abs(skew - 1) < 1e-9:
+        x = (n + 1) ** u
+    else:
+        power = 1 - skew
+        x = (((n + 1) ** power - 1) * u + 1) ** (1 / power)
+    return min(int(x) - 1, n - 1)
+
+
+class DatasetGenerator:
+    """
+    Детерминированный синтетический набор данных.
+
+    Популярность произведений и активность пользователей распределены
+    по Ципфу: чем меньше номер, тем больше отзывов у произведения и тем
+    чаще пользователь пишет отзывы и комментарии. У каждой модели свой
+    генератор случайных чисел от seed, поэтому набор не зависит от
+    размера пачек и порядка загрузки. id выдаются подряд, начиная с
+    start_ids[имя] + 1.
+    """
+
+    def __init__(self, titles, users, reviews, comments, categories=20,
+                 genres=30, skew=1.1, seed=0, start_ids=None):
+        self.titles = titles
+        self.users = users
+        self.reviews = reviews
+        self.comments = comments
+        self.categories = categories
+        self.genres = genres
+        self.skew = skew
+        self.seed = seed
+        self.start_ids = start_ids or {}
+        self.review_count = 0
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def first_id(self, name):
+        return self.start_ids.get(name, 0) + 1
+
+    @staticmethod
+    def pub_date(rng):
+        return BASE_DATE + timedelta(seconds=rng.randrange(DATE_SPAN))
+
+    @staticmethod
+    def text(rng):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(5, 30)))
+
+    def user_rows(self):
+        first = self.first_id('users')
+        header = ('id', 'username', 'email', 'password', 'date_joined')
+        rows = (
+            (pk, f'gen_user{pk}', f'gen_user{pk}@example.com', '!',
+             BASE_DATE)
+            for pk in range(first, first + self.users)
+        )
+        return header, rows
+
+    def category_rows(self):
+        first = self.first_id('categories')
+        rows = (
+            (pk, f'Категория {pk}', f'gen-category-{pk}')
+            for pk in range(first, first + self.categories)
+        )
+        return ('id', 'name', 'slug'), rows
+
+    def genre_rows(self):
+        first = self.first_id('genres')
+        rows = (
+            (pk, f'Жанр {pk}', f'gen-genre-{pk}')
+            for pk in range(first, first + self.genres)
+        )
+        return ('id', 'name', 'slug'), rows
+
+    def title_rows(self):
+        rng = self.random('titles')
+        first = self.first_id('titles')
+        first_category = self.first_id('categories')
+        header = ('id', 'name', 'year', 'description', 'category')
+        rows = (
+            (
+                pk,
+                f'Произведение {pk}',
+                rng.randint(1900, 2022),
+                self.text(rng),
+                first_category + rng.randrange(self.categories),
+            )
+            for pk in range(first, first + self.titles)
+        )
+        return header, rows
+
+    def title_genre_rows(self):
+        rng = self.random('title_genres')
+        first_title = self.first_id('titles')
+        first_genre = self.first_id('genres')
+
+        def rows():
+            pk = self.first_id('title_genres')
+            for title_id in range(first_title, first_title + self.titles):
+                count = rng.randint(1, min(3, self.genres))
+                for genre in rng.sample(range(self.genres), count):
+                    yield pk, title_id, first_genre + genre
+                    pk += 1
+        return ('id', 'title', 'genre'), rows()
+
+    def review_authors(self, rng, count):
+        """count разных авторов: один отзыв на произведение от автора."""
+        if count > self.users // 2:
+            return rng.sample(range(self.users), count)
+        authors = set()
+        while len(authors) < count:
+            authors.add(zipf_rank(rng, self.users, self.skew))
+        return authors
+
+    def review_rows(self):
+        rng = self.random('reviews')
+        first_title = self.first_id('titles')
+        first_user = self.first_id('users')
+
+        def rows():
+            pk = self.first_id('reviews')
+            planned = 0
+            for rank in range(self.titles):
+                # Накопленное округление: в сумме ровно self.reviews, если
+                # ни одно произведение не уперлось в число пользователей.
+                total = round(
+                    self.reviews * zipf_cdf(rank + 1, self.titles, self.skew)
+                )
+                count = min(total - planned, self.users)
+                planned = total
+                quality = rng.uniform(3, 9)
+                for author in sorted(self.review_authors(rng, count)):
+                    score = min(max(round(rng.gauss(quality, 1.5)), 1), 10)
+                    yield (
+                        pk,
+                        first_title + rank,
+                        self.text(rng),
+                        first_user + author,
+                        score,
+                        self.pub_date(rng),
+                    )
+                    pk += 1
+                    self.review_count += 1
+        header = ('id', 'title', 'text', 'author', 'score', 'pub_date')
+        return header, rows()
+
+    def comment_rows(self):
+        """Вызывать после загрузки отзывов: нужно их итоговое число."""
+        rng = self.random('comments')
+        first = self.first_id('comments')
+        first_review = self.first_id('reviews')
+        first_user = self.first_id('users')
+        count = self.comments if self.review_count else 0
+        rows = (
+            (
+                pk,
+                first_review + zipf_rank(rng, self.review_count, self.skew),
+                self.text(rng),
+                first_user + zipf_rank(rng, self.users, self.skew),
+                self.pub_date(rng),
+            )
+            for pk in range(first, first + count)
+        )
+        return ('id', 'review', 'text', 'author', 'pub_date'), rows
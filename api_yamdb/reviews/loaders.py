@@ -0,0 +1,246 @@
+import csv
+import io
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
+
+from .signals import rows_loaded
+
+
+@dataclass
+class LoadResult:
+    total_rows: int = 0
+    created: int = 0
+    elapsed: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed:
+            return float(self.created)
+        return self.created / self.elapsed
+
+
+class BulkCsvLoader:
+    """
+    Потоковая загрузка CSV пачками фиксированного размера.
+
+    Колонки сопоставляются с полями модели по имени (category) или по
+    имени столбца (title_id), поэтому подходят те же файлы, что и для
+    ресурсов import-export. Внешние ключи проверяются одним запросом на
+    пачку, найденные id запоминаются между пачками. Каждая пачка пишется
+    в своей транзакции через COPY на PostgreSQL и bulk_create в
+    остальных случаях. Если пачку отклонила БД (например, нарушена
+    уникальность), она пишется заново по одной строке, и ошибка
+    относится к своей строке.
+
+    check_relations=False отключает проверку внешних ключей для заведомо
+    согласованных данных, например сгенерированных generatedata.
+    """
+
+    def __init__(self, model, chunk_size=5000, use_copy=None,
+                 check_relations=True):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.check_relations = check_relations
+        if use_copy is None:
+            use_copy = connection.vendor == 'postgresql'
+        self.use_copy = use_copy
+        self.known_ids = {}
+        self.fields = list(model._meta.concrete_fields)
+
+    def get_columns(self, header):
+        columns = []
+        for name in header:
+            for model_field in self.fields:
+                if name in (model_field.name, model_field.attname):
+                    columns.append(model_field)
+                    break
+            else:
+                raise ValueError(
+                    f'Колонка {name} не найдена в модели '
+                    f'{self.model._meta.object_name}'
+                )
+        return columns
+
+    def load(self, path):
+        with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            return self.load_rows(next(reader), reader)
+
+    def load_rows(self, header, rows):
+        """
+        Загружает строки из любого итератора. Значения могут быть как
+        строками из CSV, так и готовыми значениями Python.
+        """
+        result = LoadResult()
+        started = time.monotonic()
+        columns = self.get_columns(header)
+        rows = iter(rows)
+        line = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            instances = self.build_instances(
+                columns, chunk, line + 1, result
+            )
+            if self.check_relations:
+                self.check_foreign_keys(instances, result)
+            self.write_chunk(instances, result)
+            line += len(chunk)
+            result.total_rows = line
+        result.elapsed = time.monotonic() - started
+        if result.created:
+            self.reset_sequences()
+            rows_loaded.send(sender=self.model)
+        return result
+
+    def build_instances(self, columns, rows, first_line, result):
+        instances = []
+        for line, row in enumerate(rows, start=first_line):
+            if len(row) != len(columns):
+                result.errors.append((
+                    line,
+                    f'ожидалось колонок: {len(columns)}, '
+                    f'в строке: {len(row)}'
+                ))
+                continue
+            values = {}
+            try:
+                for model_field, raw in zip(columns, row):
+                    if raw == '' and model_field.null:
+                        value = None
+                    else:
+                        value = model_field.to_python(raw)
+                    values[model_field.attname] = value
+            except ValidationError as error:
+                messages = '; '.join(error.messages)
+                result.errors.append((line, f'{model_field.name}: {messages}'))
+                continue
+            instances.append((line, self.model(**values)))
+        return instances
+
+    def check_foreign_keys(self, instances, result):
+        for model_field in self.fields:
+            if not model_field.is_relation:
+                continue
+            related_model = model_field.related_model
+            known = self.known_ids.setdefault(related_model, set())
+            wanted = {
+                getattr(instance, model_field.attname)
+                for _, instance in instances
+            } - known - {None}
+            if wanted:
+                known.update(
+                    related_model._default_manager.filter(
+                        pk__in=wanted
+                    ).values_list('pk', flat=True)
+                )
+            missing = set()
+            for line, instance in instances:
+                value = getattr(instance, model_field.attname)
+                if value is not None and value not in known:
+                    result.errors.append((
+                        line,
+                        f'{model_field.name}: объект '
+                        f'{related_model._meta.object_name} с id={value} '
+                        f'не найден'
+                    ))
+                    missing.add(id(instance))
+            if missing:
+                instances[:] = [
+                    (line, instance) for line, instance in instances
+                    if id(instance) not in missing
+                ]
+
+    def write_chunk(self, instances, result):
+        if not instances:
+            return
+        try:
+            self.write_objects([instance for _, instance in instances])
+        except DatabaseError:
+            for line, instance in instances:
+                try:
+                    self.write_objects([instance])
+                except DatabaseError as error:
+                    result.errors.append((line, str(error).strip()))
+                else:
+                    result.created += 1
+            return
+        result.created += len(instances)
+
+    def write_objects(self, objects):
+        with transaction.atomic():
+            if self.use_copy:
+                self.copy(objects)
+            else:
+                self.model._default_manager.bulk_create(objects)
+
+    def copy(self, objects):
+        fields = [
+            model_field for model_field in self.fields
+            if not (model_field.primary_key and objects[0].pk is None)
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for instance in objects:
+            row = []
+            for model_field in fields:
+                value = model_field.pre_save(instance, add=True)
+                value = model_field.get_db_prep_save(value, connection)
+                row.append(r'\N' if value is None else value)
+            writer.writerow(row)
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ', '.join(
+            quote(model_field.column) for model_field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(self.model._meta.db_table)} ({columns}) '
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        if not statements:
+            return
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+@contextmanager
+def deferred_indexes(models):
+    """
+    Удаляет индексы из Meta.indexes моделей на время массовой загрузки и
+    создает их заново в конце. Ограничения уникальности и индексы внешних
+    ключей не трогаются: без них загрузка пропустила бы дубликаты. Работает
+    только на PostgreSQL.
+    """
+    indexes = [
+        (model, index)
+        for model in models
+        for index in model._meta.indexes
+    ]
+    if connection.vendor != 'postgresql' or not indexes:
+        yield
+        return
+    with connection.schema_editor() as schema_editor:
+        for model, index in indexes:
+            schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for model, index in indexes:
+                schema_editor.add_index(model, index)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.exporters import EXPORTS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Export model objects to CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name',
+            type=str,
+            choices=sorted(EXPORTS),
+            help='Набор данных, имя совпадает с файлом в static/data'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            choices=FORMATS,
+            default='csv',
+            help='Формат выгрузки'
+        )
+        parser.add_argument(
+            '--path',
+            type=str,
+            help='Файл для записи, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=2000,
+            help='Количество строк, читаемых из БД за раз'
+        )
+
+    def handle(self, *args, **options):
+        chunks = export(
+            options['name'], options['output'], options['chunk_size']
+        )
+        if not options.get('path'):
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        try:
+            with open(options['path'], 'w', encoding='utf-8',
+                      newline='') as export_file:
+                for chunk in chunks:
+                    export_file.write(chunk)
+        except OSError as error:
+            raise CommandError(error)
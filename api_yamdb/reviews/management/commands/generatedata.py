@@ -0,0 +1,102 @@
+from contextlib import nullcontext
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from reviews.generators import DatasetGenerator
+from reviews.loaders import BulkCsvLoader, deferred_indexes
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+
+User = get_user_model()
+
+STAGES = (
+    ('users', User, 'user_rows'),
+    ('categories', Category, 'category_rows'),
+    ('genres', Genre, 'genre_rows'),
+    ('titles', Title, 'title_rows'),
+    ('title_genres', TitleGenre, 'title_genre_rows'),
+    ('reviews', Review, 'review_rows'),
+    ('comments', Comment, 'comment_rows'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для популярности'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=10000,
+            help='Количество строк в пачке'
+        )
+        parser.add_argument(
+            '--defer_indexes',
+            action='store_true',
+            help=(
+                'Удалить индексы из Meta.indexes на время загрузки '
+                '(PostgreSQL). Ограничения уникальности и индексы внешних '
+                'ключей остаются'
+            )
+        )
+
+    def handle(self, *args, **options):
+        # Новые id начинаются после существующих, поэтому набор можно
+        # догрузить в непустую базу; повторяемость гарантируется на пустой.
+        start_ids = {
+            name: model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+            for name, model, _ in STAGES
+        }
+        generator = DatasetGenerator(
+            titles=options['titles'],
+            users=options['users'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            categories=options['categories'],
+            genres=options['genres'],
+            skew=options['skew'],
+            seed=options['seed'],
+            start_ids=start_ids,
+        )
+        models = [model for _, model, _ in STAGES]
+        indexes = (
+            deferred_indexes(models) if options['defer_indexes']
+            else nullcontext()
+        )
+        with indexes:
+            for name, model, method in STAGES:
+                self.load(
+                    name, model, *getattr(generator, method)(), options
+                )
+
+    def load(self, name, model, header, rows, options):
+        loader = BulkCsvLoader(
+            model, chunk_size=options['chunk_size'], check_relations=False
+        )
+        self.stdout.write(
+            self.style.MIGRATE_HEADING('\nГенерация: ') + name
+        )
+        result = loader.load_rows(header, rows)
+        for line, error in result.errors:
+            self.stdout.write(self.style.ERROR(
+                f'  Номер строки: {line} - {error}'
+            ))
+        style = self.style.ERROR if result.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Загружено {result.created} из {result.total_rows} строк '
+            f'за {result.elapsed:.2f} с '
+            f'({result.rows_per_second:.0f} строк/с)'
+        ))
@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.utils.module_loading import import_string
 from import_export.formats import base_formats
 from import_export.resources import modelresource_factory
+from reviews.loaders import BulkCsvLoader
 
 
 class Command(BaseCommand):
@@ -17,6 +18,17 @@ class Command(BaseCommand):
             type=str,
             help='Resource class as dotted path: app.resources.ModelResource'
         )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Потоковая загрузка пачками через bulk_create или COPY'
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=5000,
+            help='Количество строк в пачке для --fast'
+        )
 
     @staticmethod
     def get_resource_class(app_name, model_name, resource_class):
@@ -26,7 +38,30 @@ class Command(BaseCommand):
         else:
             return import_string(resource_class)
 
+    def load_fast(self, options):
+        model = apps.get_model(options['app_name'], options['model_name'])
+        loader = BulkCsvLoader(model, chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.MIGRATE_HEADING('\nЗагрузка файла: ') + options['path']
+        )
+        result = loader.load(options['path'])
+        self.stdout.write(f'Количество строк: {result.total_rows}')
+        for line, error in result.errors:
+            self.stdout.write(self.style.ERROR(
+                f'  Номер строки: {line} - {error}'
+            ))
+        style = self.style.ERROR if result.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Загружено {result.created} из {result.total_rows} строк '
+            f'в модель {options["model_name"]} '
+            f'за {result.elapsed:.2f} с '
+            f'({result.rows_per_second:.0f} строк/с)'
+        ))
+
     def handle(self, *args, **options):
+        if options.get('fast'):
+            self.load_fast(options)
+            return
         file_path = options['path']
         file_format = base_formats.CSV()
         resource_class = self.get_resource_class(
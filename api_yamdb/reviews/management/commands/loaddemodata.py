@@ -1,55 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.apps import apps
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from reviews.loaders import deferred_indexes
 
-
-class Command(BaseCommand):
-    help = 'Load demo data to database from static/data folder'
-
-    def handle(self, *args, **options):
-        call_command('makemigrations')
-        call_command('migrate')
-        call_command(
-            'loadcsv',
-            'static/data/users.csv',
-            'authentication',
-            'User'
-        )
-        call_command(
-            'loadcsv',
-            'static/data/category.csv',
-            'reviews',
-            'Category',
-        )
-        call_command(
-            'loadcsv',
-            'static/data/genre.csv',
-            'reviews',
-            'Genre',
-        )
-        call_command(
-            'loadcsv',
-            'static/data/titles.csv',
-            'reviews',
-            'Title'
-        )
-        call_command(
-            'loadcsv',
+# Файлы сгруппированы по зависимостям внешних ключей: файлы одной стадии
+# не ссылаются друг на друга и могут загружаться параллельно.
+STAGES = (
+    (
+        ('static/data/users.csv', 'authentication', 'User', None),
+        ('static/data/category.csv', 'reviews', 'Category', None),
+        ('static/data/genre.csv', 'reviews', 'Genre', None),
+    ),
+    (
+        ('static/data/titles.csv', 'reviews', 'Title', None),
+    ),
+    (
+        (
             'static/data/genre_title.csv',
             'reviews',
             'TitleGenre',
-            resource_class='reviews.resources.TitleGenreResource'
-        )
-        call_command(
-            'loadcsv',
+            'reviews.resources.TitleGenreResource',
+        ),
+        (
             'static/data/review.csv',
             'reviews',
             'Review',
-            resource_class='reviews.resources.ReviewResource'
-        )
-        call_command(
-            'loadcsv',
+            'reviews.resources.ReviewResource',
+        ),
+    ),
+    (
+        (
             'static/data/comments.csv',
             'reviews',
             'Comment',
-            resource_class='reviews.resources.CommentResource'
+            'reviews.resources.CommentResource',
+        ),
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = 'Load demo data to database from static/data folder'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Количество потоков загрузки внутри стадии'
+        )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Загружать файлы через loadcsv --fast'
+        )
+        parser.add_argument(
+            '--defer_indexes',
+            action='store_true',
+            help=(
+                'Удалить индексы из Meta.indexes на время загрузки '
+                '(PostgreSQL). Ограничения уникальности и индексы внешних '
+                'ключей остаются'
+            )
+        )
+
+    def load_file(self, path, app_name, model_name, resource_class, fast):
+        call_command(
+            'loadcsv', path, app_name, model_name,
+            resource_class=resource_class,
+            fast=fast,
+            stdout=self.stdout,
+        )
+
+    def load_file_in_thread(self, *args):
+        try:
+            self.load_file(*args)
+        finally:
+            # Каждый поток работает со своим соединением, закрываем его
+            # сразу, чтобы не копить открытые соединения.
+            connections.close_all()
+
+    def load_stages(self, workers, fast):
+        if workers == 1:
+            for stage in STAGES:
+                for item in stage:
+                    self.load_file(*item, fast)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for stage in STAGES:
+                futures = [
+                    executor.submit(self.load_file_in_thread, *item, fast)
+                    for item in stage
+                ]
+                for future in futures:
+                    future.result()
+
+    def get_workers(self, requested):
+        # SQLite не допускает параллельной записи из разных соединений.
+        if connection.vendor == 'sqlite':
+            return 1
+        return max(requested, 1)
+
+    def handle(self, *args, **options):
+        call_command('migrate')
+        workers = self.get_workers(options['workers'])
+        models = [
+            apps.get_model(app_name, model_name)
+            for stage in STAGES
+            for _, app_name, model_name, _ in stage
+        ]
+        indexes = (
+            deferred_indexes(models) if options['defer_indexes']
+            else nullcontext()
         )
+        with indexes:
+            self.load_stages(workers, options['fast'])
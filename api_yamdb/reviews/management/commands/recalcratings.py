@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Title, TitleStats
+from reviews.ratings import recalculate_ratings
+from reviews.stats import recalculate_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored title ratings and stats from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--title_id',
+            type=int,
+            nargs='*',
+            help='Пересчитать только указанные произведения'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Title.objects.all()
+        stats = TitleStats.objects.all()
+        if options.get('title_id'):
+            queryset = queryset.filter(pk__in=options['title_id'])
+            stats = stats.filter(title_id__in=options['title_id'])
+        updated = recalculate_ratings(queryset)
+        recalculate_stats(stats)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг и статистика пересчитаны для произведений: {updated}'
+        ))
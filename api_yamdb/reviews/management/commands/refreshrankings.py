@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from reviews.rankings import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = 'Refresh materialized top-rated and trending title rankings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать все произведения, а не только измененные'
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=5000,
+            help='Количество произведений в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_rankings(
+            full=options['full'], chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны для произведений: {refreshed}'
+        ))
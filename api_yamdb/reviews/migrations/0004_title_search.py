@@ -0,0 +1,81 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+POSTGRESQL_FORWARDS = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS title_name_trgm_idx '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS title_description_trgm_idx '
+    'ON reviews_title USING gin (description gin_trgm_ops)',
+)
+POSTGRESQL_BACKWARDS = (
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+    'DROP INDEX IF EXISTS title_description_trgm_idx',
+)
+SQLITE_FORWARDS = (
+    "CREATE VIRTUAL TABLE reviews_title_search USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER reviews_title_search_insert AFTER INSERT "
+    "ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER reviews_title_search_delete AFTER DELETE "
+    "ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_search"
+    "(reviews_title_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER reviews_title_search_update "
+    "AFTER UPDATE OF name, description ON reviews_title BEGIN "
+    "INSERT INTO reviews_title_search"
+    "(reviews_title_search, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO reviews_title_search(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "INSERT INTO reviews_title_search(reviews_title_search) "
+    "VALUES ('rebuild')",
+)
+SQLITE_BACKWARDS = (
+    'DROP TRIGGER IF EXISTS reviews_title_search_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_search_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_search_update',
+    'DROP TABLE IF EXISTS reviews_title_search',
+)
+
+
+def execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_FORWARDS)
+    elif vendor == 'sqlite':
+        try:
+            execute(schema_editor, SQLITE_FORWARDS[:1])
+        except OperationalError:
+            # Сборка SQLite без FTS5 или триграммного токенизатора,
+            # поиск будет работать через LIKE.
+            return
+        execute(schema_editor, SQLITE_FORWARDS[1:])
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_BACKWARDS)
+    elif vendor == 'sqlite':
+        execute(schema_editor, SQLITE_BACKWARDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def fill_stats(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    TitleStats.objects.bulk_create(
+        TitleStats(title_id=title_id)
+        for title_id in Title.objects.values_list('pk', flat=True).iterator()
+    )
+    reviews = Review.objects.filter(
+        title=OuterRef('title_id')
+    ).order_by().values('title')
+    comments = Comment.objects.filter(
+        review__title=OuterRef('title_id')
+    ).order_by().values('review__title')
+
+    def count(rows):
+        return Coalesce(
+            Subquery(rows.annotate(total=Count('id')).values('total')),
+            0,
+            output_field=IntegerField(),
+        )
+
+    last_review = Subquery(
+        reviews.annotate(latest=Max('pub_date')).values('latest')
+    )
+    last_comment = Subquery(
+        comments.annotate(latest=Max('pub_date')).values('latest')
+    )
+    TitleStats.objects.update(
+        review_count=count(reviews),
+        comment_count=count(comments),
+        last_activity=Greatest(
+            Coalesce(last_review, last_comment),
+            Coalesce(last_comment, last_review),
+        ),
+        **{
+            f'score_{score}': count(reviews.filter(score=score))
+            for score in range(1, 11)
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title')),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+            ],
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
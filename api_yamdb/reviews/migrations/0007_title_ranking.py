@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='reviews.Title')),
+                ('bayesian_score', models.FloatField(db_index=True, verbose_name='Байесовский рейтинг')),
+                ('trending_key', models.FloatField(db_index=True, null=True, verbose_name='Ключ популярности')),
+                ('refreshed_at', models.DateTimeField(db_index=True, verbose_name='Время пересчета')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titleranking',
+            name='bayesian_mean',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='bayesian_prior',
+            field=models.FloatField(null=True),
+        ),
+    ]
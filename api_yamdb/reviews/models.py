@@ -80,9 +80,35 @@ class Title(models.Model):
         null=True,
         blank=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(
+                fields=['year', 'name'],
+                name='title_year_name_idx',
+            ),
+            models.Index(
+                fields=['category', 'name'],
+                name='title_category_name_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -110,6 +136,14 @@ class TitleGenre(models.Model):
                 name='unique_genre',
             )
         ]
+        # unique_genre начинается с title, для выборки по жанру нужен
+        # индекс с genre в начале.
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='titlegenre_genre_title_idx',
+            )
+        ]
 
 
 class Review(models.Model):
@@ -140,10 +174,16 @@ class Review(models.Model):
         ordering = ('pub_date',)
         constraints = [
             models.UniqueConstraint(
-                fields=['title', 'author', 'pub_date'],
+                fields=['title', 'author'],
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            )
+        ]
 
 
 class Comment(models.Model):
@@ -165,3 +205,87 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            )
+        ]
+
+
+SCORES = range(1, 11)
+
+
+class TitleStats(models.Model):
+    """
+    Статистика отзывов произведения, которую обновляют сигналы при
+    записи отзывов и комментариев. Чтение не агрегирует таблицу отзывов.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+    )
+    last_activity = models.DateTimeField(
+        verbose_name='Последняя активность',
+        null=True,
+        blank=True,
+    )
+
+    @property
+    def scores(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+
+class TitleRanking(models.Model):
+    """
+    Материализованный рейтинг для лидербордов, обновляется командой
+    refreshrankings.
+
+    trending_key - логарифм затухающей суммы оценок за последние дни,
+    приведенный к фиксированной эпохе. Экспоненциальное затухание
+    одинаково для всех произведений, поэтому порядок по ключу не
+    меняется со временем и ключ пересчитывается только после новых
+    отзывов.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+    )
+    bayesian_score = models.FloatField(
+        verbose_name='Байесовский рейтинг',
+        db_index=True,
+    )
+    trending_key = models.FloatField(
+        verbose_name='Ключ популярности',
+        null=True,
+        db_index=True,
+    )
+    refreshed_at = models.DateTimeField(
+        verbose_name='Время пересчета',
+        db_index=True,
+    )
+    # Общее среднее и вес, с которыми посчитан bayesian_score.
+    bayesian_mean = models.FloatField(null=True)
+    bayesian_prior = models.FloatField(null=True)
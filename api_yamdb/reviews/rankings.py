@@ -0,0 +1,181 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (ExpressionWrapper, FloatField, Max, OuterRef, Q,
+                              Subquery, Sum, Value)
+from django.utils.timezone import now as current_time
+
+from .models import Review, Title, TitleRanking
+
+# Точка отсчета для ключа популярности, менять нельзя без --full.
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# last_activity берется из pub_date, а запись фиксируется позже. Отзыв,
+# сохраненный во время прошлого пересчета, может оказаться старше его
+# начала, поэтому окно изменений захватывает запас перед ним.
+ACTIVITY_MARGIN = timedelta(minutes=5)
+
+
+def invalidate_rankings():
+    """Помечает рейтинги устаревшими: следующий пересчет будет полным."""
+    TitleRanking.objects.update(refreshed_at=TRENDING_EPOCH)
+
+
+def half_life():
+    return timedelta(hours=settings.RANKING_TRENDING_HALF_LIFE_HOURS)
+
+
+def trending_window():
+    return timedelta(days=settings.RANKING_TRENDING_WINDOW_DAYS)
+
+
+def _half_lives(moment):
+    return (moment - TRENDING_EPOCH) / half_life()
+
+
+def trending_key(reviews):
+    """
+    log2 суммы score / 10 * 2 ** ((pub_date - эпоха) / период полураспада)
+    по отзывам (score, pub_date). Считается через максимум, чтобы степени
+    двойки не переполнялись.
+    """
+    if not reviews:
+        return None
+    exponents = [(score, _half_lives(pub_date)) for score, pub_date in reviews]
+    top = max(exponent for _, exponent in exponents)
+    total = sum(
+        score / 10 * 2 ** (exponent - top) for score, exponent in exponents
+    )
+    return top + math.log2(total)
+
+
+def trending_score(key, now=None):
+    """Текущая затухшая сумма оценок по сохраненному ключу."""
+    if key is None:
+        return None
+    return 2 ** (key - _half_lives(now or current_time()))
+
+
+def bayesian_score(rating_sum, rating_count, mean, prior):
+    """Средняя оценка, стянутая к общему среднему при малом числе оценок."""
+    return (prior * mean + rating_sum) / (prior + rating_count)
+
+
+def global_mean():
+    totals = Title.objects.aggregate(
+        score=Sum('rating_sum'), count=Sum('rating_count')
+    )
+    if not totals['count']:
+        return 0.0
+    return totals['score'] / totals['count']
+
+
+def stored_mean():
+    """Общее среднее и вес, с которыми посчитаны сохраненные рейтинги."""
+    return TitleRanking.objects.exclude(bayesian_mean=None).values_list(
+        'bayesian_mean', 'bayesian_prior'
+    ).first()
+
+
+def rescore_rankings(mean, prior):
+    """
+    Пересчитывает bayesian_score строк, посчитанных с другим общим
+    средним или весом, одним UPDATE по суммам оценок произведений.
+    """
+    stale = TitleRanking.objects.exclude(
+        bayesian_mean=mean, bayesian_prior=prior
+    )
+    title = Title.objects.filter(pk=OuterRef('title_id'))
+    return stale.update(
+        bayesian_score=ExpressionWrapper(
+            (Value(prior * mean) + Subquery(title.values('rating_sum')))
+            / (Value(prior) + Subquery(title.values('rating_count'))),
+            output_field=FloatField(),
+        ),
+        bayesian_mean=mean,
+        bayesian_prior=prior,
+    )
+
+
+def refresh_rankings(full=False, now=None, chunk_size=5000):
+    """
+    Пересчитывает TitleRanking.
+
+    Без full обрабатываются только произведения без строки рейтинга и
+    произведения, у которых после прошлого пересчета были отзывы или
+    комментарии (TitleStats.last_activity), поэтому стоимость зависит от
+    числа свежих записей, а не от размера каталога.
+
+    Все байесовские рейтинги стянуты к одному общему среднему, иначе
+    лидерборд сравнивал бы несравнимые оценки. Среднее пересчитывается
+    только при полном пересчете, частичный берет сохраненное. Если
+    сменился вес RANKING_BAYESIAN_PRIOR, остальные строки обновляет
+    rescore_rankings одним UPDATE.
+
+    Возвращает число пересчитанных произведений.
+    """
+    now = now or current_time()
+    prior = float(settings.RANKING_BAYESIAN_PRIOR)
+    titles = Title.objects.order_by('pk')
+    stored = None
+    if not full:
+        since = TitleRanking.objects.aggregate(
+            since=Max('refreshed_at')
+        )['since']
+        stored = stored_mean()
+        if since is not None and since > TRENDING_EPOCH:
+            titles = titles.filter(
+                Q(ranking__isnull=True)
+                | Q(stats__last_activity__gte=since - ACTIVITY_MARGIN)
+            )
+        else:
+            full = True
+    mean = global_mean() if full or stored is None else stored[0]
+    if not full and (stored is None or stored[1] != prior):
+        # Строки без сохраненного среднего или с прежним весом.
+        rescore_rankings(mean, prior)
+    window_start = now - trending_window()
+    refreshed = 0
+    last_pk = 0
+    while True:
+        chunk = list(titles.filter(pk__gt=last_pk).values_list(
+            'pk', 'rating_sum', 'rating_count'
+        )[:chunk_size])
+        if not chunk:
+            return refreshed
+        last_pk = chunk[-1][0]
+        ids = [pk for pk, _, _ in chunk]
+        recent = {}
+        for title_id, score, pub_date in Review.objects.filter(
+            title_id__in=ids, pub_date__gte=window_start
+        ).order_by().values_list('title_id', 'score', 'pub_date'):
+            recent.setdefault(title_id, []).append((score, pub_date))
+        rankings = [
+            TitleRanking(
+                title_id=pk,
+                bayesian_score=bayesian_score(
+                    rating_sum, rating_count, mean, prior
+                ),
+                trending_key=trending_key(recent.get(pk)),
+                refreshed_at=now,
+                bayesian_mean=mean,
+                bayesian_prior=prior,
+            )
+            for pk, rating_sum, rating_count in chunk
+        ]
+        existing = set(TitleRanking.objects.filter(
+            pk__in=ids
+        ).values_list('pk', flat=True))
+        with transaction.atomic():
+            TitleRanking.objects.bulk_update(
+                [ranking for ranking in rankings if ranking.pk in existing],
+                (
+                    'bayesian_score', 'trending_key', 'refreshed_at',
+                    'bayesian_mean', 'bayesian_prior',
+                ),
+            )
+            TitleRanking.objects.bulk_create(
+                ranking for ranking in rankings if ranking.pk not in existing
+            )
+        refreshed += len(rankings)
@@ -0,0 +1,51 @@
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Review, Title
+from .stats import apply_bulk_review_stats
+
+
+def apply_rating_delta(title_id, score_delta, count_delta):
+    """Сдвигает сохраненные агрегаты рейтинга произведения одним UPDATE."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Cast(new_sum, FloatField()) / NullIf(new_count, 0),
+    )
+
+
+def apply_bulk_reviews(reviews):
+    """Учитывает в рейтинге и статистике отзывы из bulk_create."""
+    deltas = {}
+    for review in reviews:
+        score_delta, count_delta = deltas.get(review.title_id, (0, 0))
+        deltas[review.title_id] = (score_delta + review.score, count_delta + 1)
+    for title_id, (score_delta, count_delta) in deltas.items():
+        apply_rating_delta(title_id, score_delta, count_delta)
+    apply_bulk_review_stats(reviews)
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитывает агрегаты рейтинга по таблице отзывов одним запросом."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return queryset.order_by().update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+        rating=Subquery(
+            reviews.annotate(
+                average=Avg('score', output_field=FloatField())
+            ).values('average')
+        ),
+    )
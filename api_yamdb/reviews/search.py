@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import CharField, F, Lookup, Q, TextField
+
+SQLITE_SEARCH_TABLE = 'reviews_title_search'
+# Триграммный токенизатор FTS5 не находит подстроки короче трех символов.
+SQLITE_MIN_QUERY_LENGTH = 3
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class ILikeContains(Lookup):
+    """
+    column ILIKE '%query%' для PostgreSQL. icontains в Django 2.2 строит
+    UPPER(column::text) LIKE UPPER(...), а такое выражение триграммный
+    индекс gin (column gin_trgm_ops) не обслуживает.
+    """
+    lookup_name = 'ilike_contains'
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', [f'%{connection.ops.prep_for_like_query(value)}%']
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', lhs_params + rhs_params
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает произведения, в названии или описании которых есть query,
+    и сортирует их по релевантности (поле search_rank).
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, query)
+    if (
+        connection.vendor == 'sqlite'
+        and len(query) >= SQLITE_MIN_QUERY_LENGTH
+        and _sqlite_search_table_exists(connection.settings_dict['NAME'])
+    ):
+        return _search_sqlite(queryset, query)
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    )
+
+
+def _search_postgresql(queryset, query):
+    # Фильтр ILIKE обслуживают триграммные GIN-индексы из миграции,
+    # ранжирование считается только для найденных строк.
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector,
+                                                TrigramSimilarity)
+
+    vector = (
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+    )
+    return queryset.filter(
+        Q(name__ilike_contains=query) | Q(description__ilike_contains=query)
+    ).annotate(
+        search_rank=SearchRank(vector, SearchQuery(query, config='simple'))
+        + TrigramSimilarity('name', query)
+    ).order_by(F('search_rank').desc(), 'name')
+
+
+def _search_sqlite(queryset, query):
+    phrase = '"{}"'.format(query.replace('"', '""'))
+    # Таблица FTS присоединяется к запросу, чтобы bm25 считался в том же
+    # проходе MATCH: коррелированный подзапрос на каждую строку повторял
+    # полнотекстовый поиск и давал квадратичное время на частых словах.
+    # bm25 тем меньше, чем выше релевантность; название весит больше.
+    return queryset.extra(
+        select={
+            'search_rank': f'-bm25({SQLITE_SEARCH_TABLE}, 10.0, 1.0)'
+        },
+        tables=(SQLITE_SEARCH_TABLE,),
+        where=(
+            f'{SQLITE_SEARCH_TABLE}.rowid = reviews_title.id',
+            f'{SQLITE_SEARCH_TABLE} MATCH %s',
+        ),
+        params=(phrase,),
+    ).order_by('-search_rank', 'name')
+
+
+@lru_cache(maxsize=None)
+def _sqlite_search_table_exists(database_name):
+    return SQLITE_SEARCH_TABLE in connection.introspection.table_names()
@@ -0,0 +1,101 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils.timezone import now
+
+from .models import Comment, Review, Title, TitleStats
+from .rankings import invalidate_rankings
+from .ratings import apply_rating_delta, recalculate_ratings
+from .stats import (apply_comment_delta, apply_stats_delta,
+                    create_missing_stats, recalculate_stats)
+
+# Отправляется после массовой загрузки строк в обход save().
+rows_loaded = Signal()
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        apply_rating_delta(instance.title_id, instance.score, 1)
+        apply_stats_delta(
+            instance.title_id,
+            scores={instance.score: 1},
+            reviews=1,
+            activity=instance.pub_date,
+        )
+        return
+    previous_title_id, previous_score = previous
+    if previous_title_id == instance.title_id:
+        apply_rating_delta(
+            instance.title_id, instance.score - previous_score, 0
+        )
+        scores = {previous_score: -1}
+        scores[instance.score] = scores.get(instance.score, 0) + 1
+        apply_stats_delta(instance.title_id, scores=scores, activity=now())
+        return
+    apply_rating_delta(previous_title_id, -previous_score, -1)
+    apply_rating_delta(instance.title_id, instance.score, 1)
+    # Вместе с отзывом к другому произведению переходят его комментарии.
+    comments = instance.comments.count()
+    apply_stats_delta(previous_title_id, scores={previous_score: -1},
+                      reviews=-1, comments=-comments, activity=now())
+    apply_stats_delta(instance.title_id, scores={instance.score: 1},
+                      reviews=1, comments=comments, activity=now())
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    apply_rating_delta(instance.title_id, -instance.score, -1)
+    apply_stats_delta(
+        instance.title_id,
+        scores={instance.score: -1},
+        reviews=-1,
+        activity=now(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_stats_on_comment_save(sender, instance, created, **kwargs):
+    if created:
+        apply_comment_delta(instance, 1, activity=instance.pub_date)
+    else:
+        apply_comment_delta(instance, 0, activity=now())
+
+
+@receiver(post_delete, sender=Comment)
+def update_stats_on_comment_delete(sender, instance, **kwargs):
+    apply_comment_delta(instance, -1)
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, **kwargs):
+    if created:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(rows_loaded, sender=Review)
+def recalculate_ratings_after_load(sender, **kwargs):
+    recalculate_ratings()
+    recalculate_stats()
+    # Даты загруженных отзывов могут быть старыми, поэтому по
+    # last_activity их не найти: следующий пересчет будет полным.
+    invalidate_rankings()
+
+
+@receiver(rows_loaded, sender=Comment)
+def recalculate_stats_after_load(sender, **kwargs):
+    recalculate_stats()
+
+
+@receiver(rows_loaded, sender=Title)
+def create_stats_after_load(sender, **kwargs):
+    create_missing_stats()
@@ -0,0 +1,114 @@
+from django.db.models import (Count, DateTimeField, F, IntegerField, Max,
+                              OuterRef, Subquery, Value)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import SCORES, Comment, Review, Title, TitleStats
+
+
+def _latest(activity):
+    activity = Value(activity, output_field=DateTimeField())
+    # GREATEST в SQLite возвращает NULL, если один из аргументов NULL.
+    return Greatest(Coalesce(F('last_activity'), activity), activity)
+
+
+def apply_stats_delta(title_id, scores=None, reviews=0, comments=0,
+                      activity=None):
+    """
+    Сдвигает счетчики статистики произведения одним UPDATE.
+
+    scores - изменения числа оценок, например {8: 1, 5: -1}.
+    """
+    changes = {
+        f'score_{score}': F(f'score_{score}') + delta
+        for score, delta in (scores or {}).items() if delta
+    }
+    if reviews:
+        changes['review_count'] = F('review_count') + reviews
+    if comments:
+        changes['comment_count'] = F('comment_count') + comments
+    if activity is not None:
+        changes['last_activity'] = _latest(activity)
+    if changes:
+        TitleStats.objects.filter(title_id=title_id).update(**changes)
+
+
+def apply_comment_delta(comment, comments, activity=None):
+    """
+    То же для комментария. Если отзыв комментария не загружен,
+    произведение берется подзапросом в том же UPDATE.
+    """
+    if Comment.review.is_cached(comment):
+        apply_stats_delta(
+            comment.review.title_id, comments=comments, activity=activity
+        )
+        return
+    changes = {'comment_count': F('comment_count') + comments}
+    if activity is not None:
+        changes['last_activity'] = _latest(activity)
+    TitleStats.objects.filter(title_id=Subquery(
+        Review.objects.filter(pk=comment.review_id).values('title_id')
+    )).update(**changes)
+
+
+def apply_bulk_review_stats(reviews):
+    """Учитывает в статистике отзывы, созданные через bulk_create."""
+    deltas = {}
+    for review in reviews:
+        scores, count, activity = deltas.get(review.title_id, ({}, 0, None))
+        scores[review.score] = scores.get(review.score, 0) + 1
+        if activity is None or review.pub_date > activity:
+            activity = review.pub_date
+        deltas[review.title_id] = (scores, count + 1, activity)
+    for title_id, (scores, count, activity) in deltas.items():
+        apply_stats_delta(
+            title_id, scores=scores, reviews=count, activity=activity
+        )
+
+
+def create_missing_stats():
+    TitleStats.objects.bulk_create(
+        TitleStats(title_id=title_id)
+        for title_id in Title.objects.filter(
+            stats__isnull=True
+        ).values_list('pk', flat=True).iterator()
+    )
+
+
+def recalculate_stats(queryset=None):
+    """Пересчитывает статистику по таблицам отзывов и комментариев."""
+    create_missing_stats()
+    if queryset is None:
+        queryset = TitleStats.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('title_id')
+    ).order_by().values('title')
+    comments = Comment.objects.filter(
+        review__title=OuterRef('title_id')
+    ).order_by().values('review__title')
+
+    def count(rows):
+        return Coalesce(
+            Subquery(rows.annotate(total=Count('id')).values('total')),
+            0,
+            output_field=IntegerField(),
+        )
+
+    def latest(rows):
+        return Subquery(rows.annotate(
+            latest=Max('pub_date')
+        ).values('latest'))
+
+    last_review = latest(reviews)
+    last_comment = latest(comments)
+    return queryset.order_by().update(
+        review_count=count(reviews),
+        comment_count=count(comments),
+        last_activity=Greatest(
+            Coalesce(last_review, last_comment),
+            Coalesce(last_comment, last_review),
+        ),
+        **{
+            f'score_{score}': count(reviews.filter(score=score))
+            for score in SCORES
+        }
+    )
@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.test import TestCase
+from reviews.generators import DatasetGenerator
+from reviews.models import Comment, Review, Title, TitleGenre
+
+SIZES = {'titles': 40, 'users': 100, 'reviews': 300, 'comments': 100}
+
+
+class GenerateDataTest(TestCase):
+
+    def test_generates_consistent_skewed_dataset(self):
+        call_command(
+            'generatedata', seed=1, chunk_size=64, stdout=StringIO(),
+            categories=3, genres=5, **SIZES
+        )
+        self.assertEqual(Title.objects.count(), 40)
+        self.assertEqual(Review.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertTrue(TitleGenre.objects.exists())
+        self.assertFalse(
+            Review.objects.values('title', 'author').annotate(
+                reviews=Count('id')
+            ).filter(reviews__gt=1).exists()
+        )
+        counts = list(Title.objects.order_by('pk').values_list(
+            'rating_count', flat=True
+        ))
+        self.assertEqual(sum(counts), 300)
+        self.assertGreater(counts[0], counts[-1] * 5)
+        self.assertEqual(
+            Title.objects.aggregate(total=Sum('rating_sum'))['total'],
+            Review.objects.aggregate(total=Sum('score'))['total'],
+        )
+
+    def test_same_seed_gives_same_rows(self):
+        def rows(seed):
+            generator = DatasetGenerator(seed=seed, **SIZES)
+            return (
+                list(generator.title_rows()[1]),
+                list(generator.review_rows()[1]),
+                list(generator.comment_rows()[1]),
+            )
+        self.assertEqual(rows(1), rows(1))
+        self.assertNotEqual(rows(1), rows(2))
@@ -0,0 +1,86 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+
+class FastLoadCsvTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        User.objects.create(id=100, username='reader', email='r@mail.ru')
+
+    def write_csv(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(content)
+        return path
+
+    def load(self, path, model_name):
+        stdout = StringIO()
+        call_command(
+            'loadcsv', path, 'reviews', model_name,
+            fast=True, chunk_size=2, stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_loads_in_chunks_and_reports_bad_rows(self):
+        User.objects.create(id=101, username='writer', email='w@mail.ru')
+        titles = self.write_csv(
+            'titles.csv',
+            'id,name,year,category\n'
+            '1,First,1990,\n'
+            '2,Second,2000,\n'
+            '3,Third,2010,\n'
+        )
+        reviews = self.write_csv(
+            'review.csv',
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,good,100,10,2019-09-24T21:08:21.567Z\n'
+            '2,1,bad,101,4,2019-09-25T21:08:21.567Z\n'
+            '3,7,lost,100,5,2019-09-26T21:08:21.567Z\n'
+            '4,2,broken,100,five,2019-09-27T21:08:21.567Z\n'
+            '5,3,fine,100,8,2019-09-28T21:08:21.567Z\n'
+        )
+        self.load(titles, 'Title')
+        output = self.load(reviews, 'Review')
+
+        self.assertEqual(Title.objects.count(), 3)
+        self.assertEqual(
+            list(Review.objects.values_list('id', flat=True)), [1, 2, 5]
+        )
+        self.assertIn('Номер строки: 3 - title: объект Title с id=7', output)
+        self.assertIn('Номер строки: 4 - score', output)
+        self.assertIn('Загружено 3 из 5 строк', output)
+
+        first = Title.objects.get(pk=1)
+        self.assertEqual((first.rating_count, first.rating), (2, 7.0))
+
+    def test_database_errors_are_reported_per_line(self):
+        Title.objects.create(id=1, name='First', year=1990)
+        User.objects.create(id=101, username='writer', email='w@mail.ru')
+        reviews = self.write_csv(
+            'review.csv',
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,good,100,10,2019-09-24T21:08:21.567Z\n'
+            '2,1,again,100,4,2019-09-24T21:08:21.567Z\n'
+            '3,1,short,101\n'
+            '4,1,fine,101,8,2019-09-28T21:08:21.567Z\n'
+        )
+        output = self.load(reviews, 'Review')
+
+        # Вторая строка нарушает unique_review, первая из той же пачки
+        # все равно загружена.
+        self.assertEqual(
+            list(Review.objects.values_list('id', flat=True)), [1, 4]
+        )
+        self.assertIn('Номер строки: 2 - ', output)
+        self.assertIn('Номер строки: 3 - ожидалось колонок: 6', output)
+        self.assertIn('Загружено 2 из 4 строк', output)
@@ -0,0 +1,132 @@
+import math
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils.timezone import now
+from reviews.models import Review, Title, TitleRanking, TitleStats
+from reviews.rankings import (bayesian_score, refresh_rankings, trending_key,
+                              trending_score)
+
+User = get_user_model()
+
+
+class TitleRankingTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.popular = Title.objects.create(name='Popular', year=2000)
+        cls.single = Title.objects.create(name='Single', year=2001)
+        cls.empty = Title.objects.create(name='Empty', year=2002)
+        cls.users = [
+            User.objects.create(username=f'user{i}', email=f'{i}@mail.ru')
+            for i in range(5)
+        ]
+        for user in cls.users:
+            Review.objects.create(
+                title=cls.popular, author=user, text='a', score=8
+            )
+        Review.objects.create(
+            title=cls.single, author=cls.users[0], text='b', score=10
+        )
+        # Данные старше запаса ACTIVITY_MARGIN частичного пересчета.
+        TitleStats.objects.exclude(last_activity=None).update(
+            last_activity=now() - timedelta(hours=1)
+        )
+
+    def get_ranking(self, title):
+        return TitleRanking.objects.get(title=title)
+
+    def test_bayesian_score_shrinks_small_samples(self):
+        with self.settings(RANKING_BAYESIAN_PRIOR=10):
+            self.assertEqual(refresh_rankings(), 3)
+        mean = 50 / 6
+        self.assertAlmostEqual(
+            self.get_ranking(self.popular).bayesian_score,
+            bayesian_score(40, 5, mean, 10)
+        )
+        self.assertAlmostEqual(
+            self.get_ranking(self.empty).bayesian_score, mean
+        )
+        # Единственная десятка стягивается к общему среднему.
+        single = self.get_ranking(self.single).bayesian_score
+        self.assertTrue(mean < single < 9)
+        self.assertIsNone(self.get_ranking(self.empty).trending_key)
+
+    def test_trending_key_is_time_invariant(self):
+        moment = now()
+        reviews = [(8, moment), (4, moment - timedelta(hours=24))]
+        with self.settings(RANKING_TRENDING_HALF_LIFE_HOURS=24):
+            key = trending_key(reviews)
+            self.assertAlmostEqual(trending_score(key, moment), 1.0)
+            self.assertAlmostEqual(
+                trending_score(key, moment + timedelta(hours=48)), 0.25
+            )
+            older = trending_key([(10, moment - timedelta(hours=48))])
+        self.assertAlmostEqual(key - older, math.log2(4))
+        self.assertIsNone(trending_key([]))
+
+    def test_incremental_refresh_touches_recent_writes(self):
+        refresh_rankings()
+        stale = self.get_ranking(self.single).refreshed_at
+        Review.objects.create(
+            title=self.single, author=self.users[1], text='c', score=10
+        )
+        self.assertEqual(refresh_rankings(), 1)
+        self.assertEqual(self.get_ranking(self.popular).refreshed_at, stale)
+        self.assertGreater(self.get_ranking(self.single).refreshed_at, stale)
+        Review.objects.filter(title=self.single).first().delete()
+        self.assertEqual(refresh_rankings(), 1)
+        self.assertEqual(refresh_rankings(full=True), 3)
+
+    def test_incremental_refresh_keeps_stored_mean(self):
+        with self.settings(RANKING_BAYESIAN_PRIOR=10):
+            refresh_rankings()
+            popular = self.get_ranking(self.popular).bayesian_score
+            Review.objects.create(
+                title=self.single, author=self.users[1], text='c', score=2
+            )
+            self.assertEqual(refresh_rankings(), 1)
+            # Частичный пересчет не трогает остальные строки и считает
+            # новую оценку к тому же среднему.
+            mean = 50 / 6
+            self.assertEqual(
+                self.get_ranking(self.popular).bayesian_score, popular
+            )
+            self.assertAlmostEqual(
+                self.get_ranking(self.single).bayesian_score,
+                bayesian_score(12, 2, mean, 10)
+            )
+            refresh_rankings(full=True)
+        mean = 52 / 7
+        self.assertAlmostEqual(
+            self.get_ranking(self.popular).bayesian_score,
+            bayesian_score(40, 5, mean, 10)
+        )
+        self.assertAlmostEqual(
+            self.get_ranking(self.empty).bayesian_score, mean
+        )
+
+    def test_prior_change_rescores_all_rows(self):
+        with self.settings(RANKING_BAYESIAN_PRIOR=10):
+            refresh_rankings()
+        with self.settings(RANKING_BAYESIAN_PRIOR=2):
+            self.assertEqual(refresh_rankings(), 0)
+        self.assertAlmostEqual(
+            self.get_ranking(self.popular).bayesian_score,
+            bayesian_score(40, 5, 50 / 6, 2)
+        )
+
+    def test_activity_during_refresh_is_picked_up(self):
+        refresh_rankings()
+        started = self.get_ranking(self.popular).refreshed_at
+        # Отзыв сохранен до начала пересчета, а зафиксирован после.
+        author = User.objects.create(username='late', email='l@mail.ru')
+        review = Review.objects.create(
+            title=self.popular, author=author, text='d', score=1,
+            pub_date=started - timedelta(minutes=1),
+        )
+        TitleStats.objects.filter(title=self.popular).update(
+            last_activity=review.pub_date
+        )
+        self.assertEqual(refresh_rankings(), 1)
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+
+class TitleRatingTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first_user = User.objects.create(
+            username='first', email='first@example.com'
+        )
+        cls.second_user = User.objects.create(
+            username='second', email='second@example.com'
+        )
+        cls.title = Title.objects.create(name='Title', year=2000)
+        cls.other_title = Title.objects.create(name='Other', year=2001)
+
+    def assert_rating(self, title, rating_sum, rating_count, rating):
+        title.refresh_from_db()
+        self.assertEqual(title.rating_sum, rating_sum)
+        self.assertEqual(title.rating_count, rating_count)
+        self.assertEqual(title.rating, rating)
+
+    def test_rating_follows_review_writes(self):
+        self.assert_rating(self.title, 0, 0, None)
+        review = Review.objects.create(
+            title=self.title, author=self.first_user, text='1', score=10
+        )
+        Review.objects.create(
+            title=self.title, author=self.second_user, text='2', score=5
+        )
+        self.assert_rating(self.title, 15, 2, 7.5)
+
+        review.score = 2
+        review.save()
+        self.assert_rating(self.title, 7, 2, 3.5)
+
+        review.title = self.other_title
+        review.save()
+        self.assert_rating(self.title, 5, 1, 5.0)
+        self.assert_rating(self.other_title, 2, 1, 2.0)
+
+        review.delete()
+        self.assert_rating(self.other_title, 0, 0, None)
+
+    def test_recalcratings_command(self):
+        Review.objects.create(
+            title=self.title, author=self.first_user, text='1', score=4
+        )
+        Review.objects.create(
+            title=self.title, author=self.second_user, text='2', score=9
+        )
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('recalcratings', stdout=StringIO())
+
+        self.assert_rating(self.title, 13, 2, 6.5)
+        self.assert_rating(self.other_title, 0, 0, None)
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from reviews.models import Comment, Review, Title, TitleStats
+from reviews.ratings import apply_bulk_reviews
+from reviews.stats import recalculate_stats
+
+User = get_user_model()
+
+
+class TitleStatsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='First', year=2000)
+        cls.other = Title.objects.create(name='Second', year=2001)
+        cls.users = [
+            User.objects.create(username=f'user{i}', email=f'{i}@mail.ru')
+            for i in range(3)
+        ]
+
+    def get_stats(self, title=None):
+        return TitleStats.objects.get(title=title or self.title)
+
+    def assert_matches_recalculation(self):
+        expected = {
+            stats.pk: (stats.scores, stats.review_count, stats.comment_count)
+            for stats in TitleStats.objects.all()
+        }
+        recalculate_stats()
+        self.assertEqual(expected, {
+            stats.pk: (stats.scores, stats.review_count, stats.comment_count)
+            for stats in TitleStats.objects.all()
+        })
+
+    def test_counters_follow_writes(self):
+        review = Review.objects.create(
+            title=self.title, author=self.users[0], text='a', score=8
+        )
+        Review.objects.create(
+            title=self.title, author=self.users[1], text='b', score=3
+        )
+        comment = Comment.objects.create(
+            review=review, author=self.users[2], text='c'
+        )
+        stats = self.get_stats()
+        self.assertEqual(stats.review_count, 2)
+        self.assertEqual(stats.comment_count, 1)
+        self.assertEqual((stats.score_8, stats.score_3), (1, 1))
+        self.assertEqual(stats.last_activity, comment.pub_date)
+
+        review.score = 5
+        review.save()
+        self.assertEqual(
+            (self.get_stats().score_8, self.get_stats().score_5), (0, 1)
+        )
+        review.title = self.other
+        review.save()
+        self.assertEqual(self.get_stats().review_count, 1)
+        self.assertEqual(self.get_stats(self.other).score_5, 1)
+        self.assert_matches_recalculation()
+
+        review.delete()
+        stats = self.get_stats(self.other)
+        self.assertEqual((stats.review_count, stats.comment_count), (0, 0))
+        self.assert_matches_recalculation()
+
+    def test_bulk_reviews_are_counted(self):
+        reviews = Review.objects.bulk_create(
+            Review(title=self.title, author=user, text='t', score=10)
+            for user in self.users
+        )
+        apply_bulk_reviews(reviews)
+        self.assertEqual(self.get_stats().score_10, 3)
+        self.assert_matches_recalculation()
+
+    def test_deleting_title_removes_stats(self):
+        Review.objects.create(
+            title=self.title, author=self.users[0], text='a', score=8
+        )
+        self.title.delete()
+        self.assertFalse(TitleStats.objects.filter(pk=self.title.pk).exists())
+
+    def test_generated_data_gets_stats(self):
+        call_command(
+            'generatedata', titles=5, users=10, reviews=20, comments=10,
+            categories=1, genres=1, stdout=None
+        )
+        self.assertEqual(
+            TitleStats.objects.count(), Title.objects.count()
+        )
+        self.assert_matches_recalculation()